@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Gas Huffer - Sharded Build Check
+
+Runs `generate_sprites.py --shard I/N` for every shard as separate
+processes, merges them with `generate_sprites.py merge` and checks the
+result against an unsharded (0/1) build of the same catalogue. Then feeds
+the merge the shard sets it must refuse: one shard missing, one shard
+rendered from a different build (with `--variants`), one shard given
+twice and a directory that isn't a shard output. Exits non-zero if any
+check fails.
+
+    python check_shards.py --count 3
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+PIPELINE_DIR = Path(__file__).resolve().parent
+GENERATOR = PIPELINE_DIR / 'generate_sprites.py'
+
+def run_generator(args: List[str]) -> subprocess.CompletedProcess:
+    """Run generate_sprites.py in a subprocess, capturing its output."""
+    return subprocess.run([sys.executable, str(GENERATOR), *args], cwd=PIPELINE_DIR,
+                          capture_output=True, text=True)
+
+def build_shards(count: int, out_dir: Path) -> List[Path]:
+    """Render every shard of `count` concurrently, one process each."""
+    shard_dirs = [out_dir / f'shard_{index}_of_{count}' for index in range(count)]
+    processes = [
+        subprocess.Popen([sys.executable, str(GENERATOR), '--shard', f'{index}/{count}',
+                          '--output', str(shard_dir)],
+                         cwd=PIPELINE_DIR, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        for index, shard_dir in enumerate(shard_dirs)
+    ]
+    for index, process in enumerate(processes):
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            raise SystemExit(f"❌ Shard {index}/{count} failed:\n{output}")
+    return shard_dirs
+
+def merge(shard_dirs: List[Path], out_dir: Path) -> subprocess.CompletedProcess:
+    """Run `generate_sprites.py merge` on shard directories."""
+    return run_generator(['merge', *map(str, shard_dirs), '--output', str(out_dir)])
+
+def expect_refused(name: str, shard_dirs: List[Path], out_dir: Path, message: str) -> bool:
+    """Check that a merge fails and reports `message`."""
+    result = merge(shard_dirs, out_dir)
+    output = result.stdout + result.stderr
+    passed = result.returncode != 0 and message in output
+    print(f"   {'✅' if passed else '❌'} {name} is refused")
+    if not passed:
+        print(f"      expected a failure mentioning '{message}', got exit {result.returncode}:\n{output}")
+    return passed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check sharded sprite builds and shard merging.")
+    parser.add_argument('--count', type=int, default=3, help="number of shards (default: 3)")
+    args = parser.parse_args(argv)
+    if args.count < 2:
+        parser.error("--count must be at least 2")
+
+    print(f"🧩 Checking a {args.count}-shard build")
+    with tempfile.TemporaryDirectory(prefix='gas-huffer-shards-') as tmp:
+        tmp = Path(tmp)
+        shard_dirs = build_shards(args.count, tmp / 'shards')
+        single_dir, = build_shards(1, tmp / 'single')
+
+        result = merge(shard_dirs, tmp / 'merged')
+        if result.returncode != 0:
+            raise SystemExit(f"❌ Merging complete shards failed:\n{result.stdout}{result.stderr}")
+        merged = json.loads((tmp / 'merged' / 'manifest.json').read_text(encoding='utf-8'))
+        single = json.loads((single_dir / 'manifest.json').read_text(encoding='utf-8'))
+        passed = merged['sprites'] == single['sprites']
+        print(f"   {'✅' if passed else '❌'} {len(merged['sprites'])} merged sprites match an unsharded build")
+
+        # The last shard again, but from a catalogue that includes palette variants
+        stale_dir = tmp / 'stale'
+        result = run_generator(['--shard', f'{args.count - 1}/{args.count}', '--output', str(stale_dir),
+                                '--variants'])
+        if result.returncode != 0:
+            raise SystemExit(f"❌ Stale shard failed:\n{result.stdout}{result.stderr}")
+
+        # A plain output manifest (like a full run's output/manifest.json) is no shard
+        plain_dir = tmp / 'plain'
+        plain_dir.mkdir()
+        (plain_dir / 'manifest.json').write_text(json.dumps({'version': 1, 'sprites': {}}), encoding='utf-8')
+        checks = [
+            expect_refused("A missing shard", shard_dirs[:-1], tmp / 'missing',
+                           f"Missing shards: {args.count - 1}/{args.count}"),
+            expect_refused("A shard from a different build", shard_dirs[:-1] + [stale_dir], tmp / 'stale_merge',
+                           "belongs to a different sharded build"),
+            expect_refused("A duplicated shard", shard_dirs + shard_dirs[:1], tmp / 'duplicate',
+                           f"Shard 0/{args.count} given twice"),
+            expect_refused("A directory that isn't a shard", [plain_dir] + shard_dirs, tmp / 'plain_merge',
+                           f"{plain_dir} is not a shard output"),
+        ]
+
+    if not (passed and all(checks)):
+        raise SystemExit("❌ Shard checks failed")
+    print("✅ All shard checks passed")
+
+if __name__ == "__main__":
+    main()
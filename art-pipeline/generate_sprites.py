@@ -13,56 +13,148 @@ Derek Yu Methodology Principles:
 5. Clear visual hierarchy
 """
 
+import argparse
 import os
 import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 # Import sprite generation modules
-from sprites.character_sprites import generate_gas_huffer_sprites
-from sprites.monster_sprites import generate_monster_sprites  
-from sprites.environment_sprites import generate_environment_sprites
+from sprites.character_sprites import character_sprite_graph, CHARACTER_OUTLINE
+from sprites.monster_sprites import (monster_sprite_graph, generate_monster_variants, MONSTER_OUTLINES,
+                                     MONSTER_NORMAL_STYLE, monster_antialias_style)
+from sprites.environment_sprites import (environment_sprite_graph, generate_environment_variants,
+                                         TILE_NORMAL_STYLE, TILE_NORMAL_OVERRIDES)
+from sprites.light_sprites import generate_light_sprites, light_metadata, CONE_ANGLE_STEPS
+from sprites.outlining import outline_catalogue
+from sprites.antialiasing import post_process_catalogue
+from sprites.scheduler import SpriteNode, GraphRun, combine_graphs, run_graph, split_outputs
+from pipeline.catalogue import flatten_catalogue, manifest_entry, write_sprites, build_manifest, write_manifest
+from pipeline.sharding import parse_shard, select_shard, shard_manifest, merge_shards, ShardMergeError
+from pipeline.server import serve, DEFAULT_WORKERS
+from pipeline.trimming import trim_catalogue
+from pipeline.atlas import pack_atlas, atlas_stats, write_atlas
+from pipeline.bundle import write_bundle
+from pipeline.collision import build_collision_data, write_collision_data
+from pipeline.normals import build_normal_maps, normal_key, normal_map_styles
 
 # Output directories
 OUTPUT_DIR = Path('output')
 PHASER_DIR = Path('../public/assets/sprites')
 
-def main():
+# Sprite categories packed into the trimmed atlas; tiles stay as individual files
+ATLAS_CATEGORIES = ('characters', 'monsters')
+ATLAS_NAME = 'sprites_atlas'
+LIGHT_ATLAS_NAME = 'lights_atlas'
+BUNDLE_NAME = 'sprites.bundle'
+
+# Whole-catalogue exports that a shard can't produce from its slice
+FULL_RUN_FLAGS = ('atlas', 'lights', 'collision', 'normals', 'bundle')
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line options for the sprite pipeline."""
+    parser = argparse.ArgumentParser(description="Generate Gas Huffer sprites for Phaser.")
+    parser.add_argument('--variants', action='store_true',
+                        help="also export palette-swap variants of monsters and tiles")
+    parser.add_argument('--atlas', action='store_true',
+                        help="also pack trimmed characters and monsters into a Phaser texture atlas")
+    parser.add_argument('--lights', action='store_true',
+                        help="also export the pre-baked flashlight light texture atlas")
+    parser.add_argument('--collision', action='store_true',
+                        help="also export collision masks and hull polygons for characters and monsters")
+    parser.add_argument('--normals', action='store_true',
+                        help="also export Light2D normal maps for walls, floors and monsters")
+    parser.add_argument('--bundle', action='store_true',
+                        help="also write every sprite into a memory-mappable output/sprites.bundle")
+    parser.add_argument('--shard', metavar='I/N',
+                        help="render and encode only shard I of N into its own directory")
+    parser.add_argument('--output', type=Path,
+                        help="shard output directory (default: output/shards/shard_I_of_N)")
+    parser.add_argument('--serve', action='store_true',
+                        help="run a local HTTP server that renders sprites on demand")
+    parser.add_argument('--host', default='127.0.0.1', help="render server host (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="render server port (default: 8765)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"render server thread pool size (default: {DEFAULT_WORKERS})")
+    
+    commands = parser.add_subparsers(dest='command')
+    merge = commands.add_parser('merge', help="merge and verify shard outputs")
+    merge.add_argument('shard_dirs', nargs='+', type=Path, help="shard output directories")
+    merge.add_argument('--output', type=Path, default=OUTPUT_DIR / 'merged',
+                       help="merged output directory (default: output/merged)")
+    
+    args = parser.parse_args(argv)
+    if args.shard:
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as error:
+            parser.error(str(error))
+        combined = [f'--{flag}' for flag in FULL_RUN_FLAGS if getattr(args, flag)]
+        if combined:
+            parser.error(f"{', '.join(combined)} can't be combined with --shard, "
+                         f"which only encodes its slice of the sprites")
+    return args
+
+def main(argv=None):
     """Main sprite generation orchestration."""
+    args = parse_args(argv)
+    
     print("🎨 Gas Huffer Sprite Generation Pipeline")
     print("=" * 50)
     
-    start_time = time.time()
+    if args.command == 'merge':
+        merge_shard_outputs(args.shard_dirs, args.output)
+        return
     
-    # Ensure output directories exist
-    setup_directories()
+    if args.serve:
+        serve(args.host, args.port, args.workers)
+        return
     
-    # Generate all sprites
-    print("\n🎭 Generating character sprites...")
-    character_sprites = generate_gas_huffer_sprites()
-    print(f"   Generated {len(character_sprites)} character sprites")
-    
-    print("\n👻 Generating monster sprites...")
-    monster_sprites = generate_monster_sprites()
-    monster_count = sum(len(sprites) for sprites in monster_sprites.values())
-    print(f"   Generated {monster_count} monster sprites across {len(monster_sprites)} types")
-    
-    print("\n🏚️ Generating environment sprites...")
-    environment_sprites = generate_environment_sprites()
-    env_count = sum(len(sprites) for sprites in environment_sprites.values())
-    print(f"   Generated {env_count} environment sprites across {len(environment_sprites)} categories")
+    start_time = time.time()
     
-    # Save all sprites
-    print("\n💾 Saving sprites to output directory...")
-    save_sprites_to_output(character_sprites, monster_sprites, environment_sprites)
+    character_sprites, monster_sprites, environment_sprites = generate_catalogue(args.variants)
+    catalogue = flatten_catalogue(character_sprites, monster_sprites, environment_sprites)
     
-    print("\n🔄 Copying optimized sprites for Phaser...")
-    copy_sprites_for_phaser(character_sprites, monster_sprites, environment_sprites)
+    if args.shard:
+        total_sprites = build_shard(catalogue, *args.shard, args.output)
+    else:
+        # Ensure output directories exist
+        setup_directories()
+        
+        # Save all sprites
+        print("\n💾 Saving sprites to output directory...")
+        save_sprites_to_output(character_sprites, monster_sprites, environment_sprites)
+        
+        normal_maps = None
+        if args.normals:
+            print("\n🗺️ Deriving normal maps for Light2D...")
+            normal_maps = export_normal_maps(catalogue)
+        
+        write_output_manifest(catalogue, normal_maps)
+        
+        if args.bundle:
+            print("\n📦 Writing memory-mappable sprite bundle...")
+            save_sprites_to_bundle(catalogue)
+        
+        print("\n🔄 Copying optimized sprites for Phaser...")
+        copy_sprites_for_phaser(character_sprites, monster_sprites, environment_sprites)
+        total_sprites = len(catalogue)
+        
+        if args.atlas:
+            print("\n🗜️ Packing trimmed sprite atlas...")
+            export_sprite_atlas(catalogue)
+        
+        if args.collision:
+            print("\n🧱 Tracing collision masks and hulls...")
+            export_collision_data(catalogue)
+        
+        if args.lights:
+            print("\n🔦 Baking flashlight light textures...")
+            export_light_atlas()
     
     # Performance report
     end_time = time.time()
     total_time = end_time - start_time
-    total_sprites = len(character_sprites) + monster_count + env_count
     
     print(f"\n✅ Sprite generation complete!")
     print(f"   Total sprites: {total_sprites}")
@@ -74,6 +166,91 @@ def main():
     else:
         print("⚠️  Performance target missed: Over 5 seconds")
 
+def generate_catalogue(variants: bool = False) -> Tuple[Dict, Dict, Dict]:
+    """
+    Generate, outline and optionally recolor every sprite.
+    
+    Returns:
+        (character_sprites, monster_sprites, environment_sprites) dicts
+    """
+    # Generate all sprites in one dependency graph, each base rendered once
+    print("\n🕸️ Rendering sprite dependency graph...")
+    graph = catalogue_graph()
+    run = run_graph(graph)
+    rendered = split_outputs(run.outputs(graph))
+    report_graph_run(run, len(graph))
+    
+    character_sprites = rendered['characters']
+    print(f"   Generated {len(character_sprites)} character sprites")
+    
+    monster_sprites = split_outputs(rendered['monsters'])
+    monster_count = sum(len(sprites) for sprites in monster_sprites.values())
+    print(f"   Generated {monster_count} monster sprites across {len(monster_sprites)} types")
+    
+    environment_sprites = rendered['environment']
+    env_count = sum(len(sprites) for sprites in environment_sprites.values())
+    print(f"   Generated {env_count} environment sprites across {len(environment_sprites)} categories")
+    
+    print("\n✏️ Applying selective outlines...")
+    outline_start = time.time()
+    character_sprites, monster_sprites = apply_selective_outlines(character_sprites, monster_sprites)
+    print(f"   Outlined catalogue in {(time.time() - outline_start) * 1000:.1f} ms")
+    
+    if variants:
+        print("\n🎨 Generating palette-swap variants...")
+        monster_variants = generate_monster_variants(monster_sprites)
+        environment_variants = generate_environment_variants(environment_sprites)
+        monster_sprites.update(monster_variants)
+        environment_sprites.update(environment_variants)
+        variant_count = sum(len(sprites) for sprites in monster_variants.values())
+        variant_count += sum(len(sprites) for sprites in environment_variants.values())
+        print(f"   Generated {variant_count} recolored sprites "
+              f"across {len(monster_variants) + len(environment_variants)} variants")
+    
+    # Runs after palette swaps so variants get ramps mixed from their own colors
+    print("\n✨ Applying selective anti-aliasing...")
+    smoothing_start = time.time()
+    monster_sprites = apply_selective_antialiasing(monster_sprites)
+    print(f"   Smoothed catalogue in {(time.time() - smoothing_start) * 1000:.1f} ms")
+    
+    return character_sprites, monster_sprites, environment_sprites
+
+def catalogue_graph() -> Dict[str, SpriteNode]:
+    """Combine the character, monster and environment sprite graphs."""
+    return combine_graphs({
+        'characters': character_sprite_graph(),
+        'monsters': monster_sprite_graph(),
+        'environment': environment_sprite_graph(),
+    })
+
+def report_graph_run(run: GraphRun, node_count: int):
+    """Print scheduler timings and the critical path of a graph run."""
+    busy_time = sum(run.durations.values())
+    print(f"   Rendered {node_count} nodes in {run.wall_time * 1000:.1f} ms "
+          f"({busy_time * 1000:.1f} ms of node time)")
+    print(f"   Critical path ({run.critical_time * 1000:.1f} ms): {' -> '.join(run.critical_path)}")
+
+def build_shard(catalogue: Dict, index: int, count: int, output: Path = None) -> int:
+    """Encode one shard of the catalogue into its own directory with a manifest."""
+    shard_dir = output or OUTPUT_DIR / 'shards' / f'shard_{index}_of_{count}'
+    shard = select_shard(catalogue, index, count)
+    
+    print(f"\n🧩 Encoding shard {index}/{count} ({len(shard)} of {len(catalogue)} sprites)...")
+    entries = write_sprites(shard, shard_dir, optimize=True)
+    write_manifest(shard_manifest(entries, index, count, catalogue.keys()), shard_dir)
+    print(f"   Wrote {shard_dir}")
+    
+    return len(shard)
+
+def merge_shard_outputs(shard_dirs, output: Path):
+    """Merge shard directories, exiting with an error if the shards don't add up."""
+    print(f"\n🧩 Merging {len(shard_dirs)} shards into {output}...")
+    try:
+        merged = merge_shards(shard_dirs, output)
+    except (ShardMergeError, FileNotFoundError) as error:
+        raise SystemExit(f"❌ Merge failed: {error}")
+    print(f"✅ Merged {len(merged['sprites'])} sprites with no collisions or gaps")
+
 def setup_directories():
     """Create necessary output directories."""
     OUTPUT_DIR.mkdir(exist_ok=True)
@@ -88,6 +265,20 @@ def setup_directories():
     (PHASER_DIR / 'monsters').mkdir(exist_ok=True)
     (PHASER_DIR / 'environment').mkdir(exist_ok=True)
 
+def apply_selective_outlines(character_sprites: Dict, monster_sprites: Dict):
+    """Outline characters and monsters in one batched pass using per-family styles."""
+    families = {'characters': character_sprites, **monster_sprites}
+    styles = {'characters': CHARACTER_OUTLINE, **MONSTER_OUTLINES}
+    
+    outlined = outline_catalogue(families, styles)
+    character_sprites = outlined.pop('characters')
+    return character_sprites, outlined
+
+def apply_selective_antialiasing(monster_sprites: Dict) -> Dict:
+    """Anti-alias monsters (palette variants included) in one batched pass using per-family styles."""
+    styles = {family: monster_antialias_style(family) for family in monster_sprites}
+    return post_process_catalogue(monster_sprites, styles)
+
 def save_sprites_to_output(character_sprites: Dict, monster_sprites: Dict, environment_sprites: Dict):
     """Save all generated sprites to the output directory."""
     
@@ -111,6 +302,86 @@ def save_sprites_to_output(character_sprites: Dict, monster_sprites: Dict, envir
                 filepath = OUTPUT_DIR / 'environment' / f'{category}_{name}.png'
                 sprite.save(filepath, 'PNG')
 
+def save_sprites_to_bundle(catalogue: Dict):
+    """Write all sprites into a single raw bundle file beside the PNGs."""
+    path = write_bundle(catalogue, OUTPUT_DIR / BUNDLE_NAME)
+    print(f"   Bundled {len(catalogue)} sprites into {path} ({path.stat().st_size} bytes)")
+
+def write_output_manifest(catalogue: Dict, normal_maps: Dict = None):
+    """Record the sprites saved to the output directory (and their normal maps) in its manifest."""
+    entries = {}
+    for key, sprite in catalogue.items():
+        entries[key] = manifest_entry(key, sprite, (OUTPUT_DIR / f'{key}.png').read_bytes())
+        if normal_maps and key in normal_maps:
+            entries[key]['normal_map'] = {field: normal_maps[key][field] for field in ('file', 'sha256')}
+    write_manifest(build_manifest(entries), OUTPUT_DIR)
+
+def export_normal_maps(catalogue: Dict) -> Dict[str, Dict]:
+    """
+    Write a '<sprite>_n.png' normal map beside every wall, floor and monster sprite.
+    
+    Returns:
+        Manifest entries of the normal maps, keyed by their sprite's key
+    """
+    start = time.time()
+    styles = normal_map_styles(catalogue, MONSTER_NORMAL_STYLE, TILE_NORMAL_STYLE, TILE_NORMAL_OVERRIDES)
+    normals = build_normal_maps(catalogue, styles)
+    elapsed = time.time() - start
+    
+    files = {normal_key(key): normal for key, normal in normals.items()}
+    entries = write_sprites(files, OUTPUT_DIR, optimize=False)
+    write_sprites(files, PHASER_DIR, optimize=True)
+    print(f"   Derived {len(normals)} normal maps in {elapsed * 1000:.1f} ms")
+    
+    return {key: entries[normal_key(key)] for key in normals}
+
+def export_sprite_atlas(catalogue: Dict):
+    """Trim characters and monsters and pack them into one atlas for Phaser."""
+    sprites = {key: sprite for key, sprite in catalogue.items()
+               if key.split('/')[0] in ATLAS_CATEGORIES}
+    trimmed = trim_catalogue(sprites)
+    atlas, data = pack_atlas(trimmed, image_name=f'{ATLAS_NAME}.png')
+    
+    write_atlas(atlas, data, OUTPUT_DIR, ATLAS_NAME)
+    write_atlas(atlas, data, PHASER_DIR, ATLAS_NAME)
+    
+    stats = atlas_stats(trimmed, atlas)
+    print(f"   Packed {len(trimmed)} frames into a {atlas.width}x{atlas.height} atlas")
+    print(f"   Frame pixels: {stats['source_area']} untrimmed -> {stats['trimmed_area']} trimmed "
+          f"({100 * stats['trimmed_area'] / stats['source_area']:.0f}%)")
+
+def export_collision_data(catalogue: Dict):
+    """Derive collision masks and hulls for every character and monster frame."""
+    sprites = {key: sprite for key, sprite in catalogue.items()
+               if key.split('/')[0] in ATLAS_CATEGORIES}
+    collision = build_collision_data(sprites)
+    
+    write_collision_data(collision, OUTPUT_DIR)
+    path = write_collision_data(collision, PHASER_DIR)
+    print(f"   Traced {len(collision)} frames ({path.stat().st_size} bytes)")
+
+def export_light_atlas():
+    """Bake light textures and pack them into an atlas with angle metadata."""
+    lights = generate_light_sprites()
+    metadata = light_metadata()
+    
+    textures = {}
+    frame_metadata = {}
+    for light_set, sprites in lights.items():
+        for name, sprite in sprites.items():
+            textures[f'lights/{light_set}_{name}'] = sprite
+            frame_metadata[f'lights/{light_set}_{name}'] = metadata[light_set][name]
+    
+    atlas, data = pack_atlas(trim_catalogue(textures), image_name=f'{LIGHT_ATLAS_NAME}.png')
+    data['meta']['lights'] = {
+        'angle_step_degrees': 360.0 / CONE_ANGLE_STEPS,
+        'frames': frame_metadata,
+    }
+    
+    write_atlas(atlas, data, OUTPUT_DIR, LIGHT_ATLAS_NAME)
+    write_atlas(atlas, data, PHASER_DIR, LIGHT_ATLAS_NAME)
+    print(f"   Packed {len(textures)} light textures into a {atlas.width}x{atlas.height} atlas")
+
 def copy_sprites_for_phaser(character_sprites: Dict, monster_sprites: Dict, environment_sprites: Dict):
     """Copy and optimize sprites for Phaser loading."""
     
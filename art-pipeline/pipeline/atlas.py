@@ -0,0 +1,104 @@
+"""
+Texture Atlas Packing
+
+Packs trimmed sprites into a single texture with a simple shelf packer and
+describes them in Phaser's JSON Hash atlas format, including trimmed-frame
+data (`spriteSourceSize` and `sourceSize`) so Phaser restores each frame's
+original placement.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PIL import Image
+
+from pipeline.trimming import TrimmedSprite
+
+# Transparent gap between packed frames to avoid texture bleeding
+PADDING = 1
+
+def _shelf_pack(sizes: Dict[str, Tuple[int, int]], width: int) -> Tuple[Dict[str, Tuple[int, int]], int]:
+    """Place rectangles on shelves of a fixed-width texture, tallest first."""
+    positions = {}
+    x = y = shelf_height = 0
+    for key in sorted(sizes, key=lambda k: (-sizes[k][1], -sizes[k][0], k)):
+        w, h = sizes[key]
+        if x + w > width:
+            x, y = 0, y + shelf_height + PADDING
+            shelf_height = 0
+        positions[key] = (x, y)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+def _next_power_of_two(value: int) -> int:
+    return 1 << max(0, value - 1).bit_length()
+
+def pack_atlas(sprites: Dict[str, TrimmedSprite], image_name: str = 'atlas.png') -> Tuple[Image.Image, Dict]:
+    """
+    Pack trimmed sprites into an atlas texture.
+
+    Frames with identical pixels share one region of the texture.
+
+    Returns:
+        (atlas image, Phaser JSON Hash atlas data)
+    """
+    # Deduplicate identical crops so repeated poses cost no texture space
+    regions = {}
+    region_of = {}
+    for key, sprite in sprites.items():
+        digest = hashlib.sha1(sprite.image.tobytes() + repr(sprite.image.size).encode()).hexdigest()
+        regions.setdefault(digest, sprite.image)
+        region_of[key] = digest
+
+    sizes = {digest: image.size for digest, image in regions.items()}
+    total_area = sum((w + PADDING) * (h + PADDING) for w, h in sizes.values())
+    widest = max((w for w, _ in sizes.values()), default=1)
+    width = _next_power_of_two(max(widest, int(total_area ** 0.5)))
+    positions, used_height = _shelf_pack(sizes, width)
+    height = _next_power_of_two(max(1, used_height))
+
+    atlas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    for digest, image in regions.items():
+        atlas.paste(image, positions[digest])
+
+    frames = {}
+    for key, sprite in sprites.items():
+        x, y = positions[region_of[key]]
+        w, h = sprite.image.size
+        frames[key] = {
+            'frame': {'x': x, 'y': y, 'w': w, 'h': h},
+            'rotated': False,
+            'trimmed': sprite.trimmed,
+            'spriteSourceSize': {'x': sprite.x, 'y': sprite.y, 'w': w, 'h': h},
+            'sourceSize': {'w': sprite.source_width, 'h': sprite.source_height},
+        }
+
+    data = {
+        'frames': frames,
+        'meta': {
+            'app': 'gas-huffer-art-pipeline',
+            'image': image_name,
+            'format': 'RGBA8888',
+            'size': {'w': width, 'h': height},
+            'scale': '1',
+        },
+    }
+    return atlas, data
+
+def atlas_stats(sprites: Dict[str, TrimmedSprite], atlas: Image.Image) -> Dict[str, int]:
+    """Compare untrimmed frame area with trimmed and packed texture area (in pixels)."""
+    return {
+        'source_area': sum(s.source_width * s.source_height for s in sprites.values()),
+        'trimmed_area': sum(s.image.width * s.image.height for s in sprites.values()),
+        'atlas_area': atlas.width * atlas.height,
+    }
+
+def write_atlas(atlas: Image.Image, data: Dict, out_dir: Path, name: str = 'atlas'):
+    """Write the atlas texture and its JSON next to each other."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    atlas.save(out_dir / f'{name}.png', 'PNG', optimize=True)
+    (out_dir / f'{name}.json').write_text(json.dumps(data, indent=2, sort_keys=True) + '\n',
+                                          encoding='utf-8')
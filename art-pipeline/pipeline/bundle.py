@@ -0,0 +1,222 @@
+"""
+Memory-Mappable Sprite Bundles
+
+Packs a whole sprite catalogue into one binary file that can be `mmap`ed and
+read without per-file opens or PNG decoding. Layout (little-endian):
+
+    header      64 bytes   magic, version, counts and section offsets
+    index       32 bytes per sprite, sorted by key hash
+    strings     UTF-8 sprite keys referenced by the index
+    data        per sprite: optional RGBA palette, then pixels, each blob
+                starting on an ALIGNMENT-byte boundary
+
+Pixels are stored either as raw RGBA (4 bytes per pixel) or as 8-bit
+palette indices when a sprite has at most 256 colors. `SpriteBundle` returns
+zero-copy NumPy views straight into the mapping.
+"""
+
+import hashlib
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from PIL import Image
+import numpy as np
+
+MAGIC = b'GHSB'
+VERSION = 1
+ALIGNMENT = 64
+
+FORMAT_RGBA = 0
+FORMAT_INDEXED = 1
+
+HEADER = struct.Struct('<4sHHIQQQQ20x')
+INDEX_DTYPE = np.dtype([
+    ('key_hash', '<u8'),
+    ('offset', '<u8'),
+    ('key_offset', '<u4'),
+    ('key_length', '<u2'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('format', 'u1'),
+    ('reserved', 'u1'),
+    ('palette_count', '<u2'),
+    ('padding', '<u2'),
+])
+assert HEADER.size == 64 and INDEX_DTYPE.itemsize == 32
+
+def key_hash(key: str) -> int:
+    """64-bit hash used to look sprites up in the index."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def _align(value: int) -> int:
+    return (value + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _encode_pixels(sprite: Image.Image, indexed: bool) -> Tuple[int, bytes, bytes]:
+    """Return (format, palette bytes, pixel bytes) for one sprite."""
+    rgba = np.ascontiguousarray(np.asarray(sprite.convert('RGBA')))
+    if indexed:
+        packed = rgba.view(np.uint32)[..., 0]
+        colors, inverse = np.unique(packed, return_inverse=True)
+        if len(colors) <= 256:
+            indices = inverse.reshape(packed.shape).astype(np.uint8)
+            return FORMAT_INDEXED, colors.view(np.uint8).tobytes(), indices.tobytes()
+    return FORMAT_RGBA, b'', rgba.tobytes()
+
+def write_bundle(catalogue: Dict[str, Image.Image], path: Path, indexed: bool = True) -> Path:
+    """
+    Write a catalogue of sprites into a bundle file.
+
+    Args:
+        catalogue: Sprite key -> image, e.g. from `flatten_catalogue`
+        indexed: Store sprites with at most 256 colors as palette indices
+
+    Raises:
+        ValueError: If two keys share a hash
+    """
+    keys = sorted(catalogue, key=key_hash)
+    hashes = [key_hash(key) for key in keys]
+    for previous, current, key in zip(hashes, hashes[1:], keys[1:]):
+        if previous == current:
+            raise ValueError(f"Sprite key hash collision on '{key}'")
+
+    strings = bytearray()
+    index = np.zeros(len(keys), dtype=INDEX_DTYPE)
+    blobs = []
+
+    index_offset = HEADER.size
+    strings_offset = index_offset + index.nbytes
+    for i, key in enumerate(keys):
+        encoded_key = key.encode('utf-8')
+        sprite_format, palette, pixels = _encode_pixels(catalogue[key], indexed)
+        index[i] = (hashes[i], 0, len(strings), len(encoded_key), catalogue[key].width,
+                    catalogue[key].height, sprite_format, 0, len(palette) // 4, 0)
+        strings += encoded_key
+        blobs.append((palette, pixels))
+
+    data_offset = _align(strings_offset + len(strings))
+    offset = data_offset
+    for i, (palette, pixels) in enumerate(blobs):
+        index[i]['offset'] = offset
+        offset = _align(offset + _align(len(palette)) + len(pixels))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as bundle:
+        bundle.write(HEADER.pack(MAGIC, VERSION, ALIGNMENT, len(keys), index_offset,
+                                 strings_offset, len(strings), data_offset))
+        bundle.write(index.tobytes())
+        bundle.write(strings)
+        for i, (palette, pixels) in enumerate(blobs):
+            bundle.seek(int(index[i]['offset']))
+            bundle.write(palette)
+            bundle.seek(int(index[i]['offset']) + _align(len(palette)))
+            bundle.write(pixels)
+        bundle.truncate(offset)
+
+    return path
+
+class SpriteBundle:
+    """Read-only, memory-mapped view of a sprite bundle."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as bundle:
+            self._mmap = mmap.mmap(bundle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.alignment, count, index_offset, strings_offset, strings_size, _ = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a sprite bundle")
+        if version != VERSION:
+            raise ValueError(f"{self.path} has unsupported bundle version {version}")
+
+        self.index = np.frombuffer(self._mmap, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+        self._strings_offset = strings_offset
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Release the mapping.
+
+        If pixel views handed out earlier are still alive the mapping stays
+        open until they are garbage collected.
+        """
+        self.index = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def keys(self) -> Iterator[str]:
+        """Sprite keys in index order."""
+        for entry in self.index:
+            yield self._key(entry)
+
+    def _key(self, entry) -> str:
+        start = self._strings_offset + int(entry['key_offset'])
+        return self._mmap[start:start + int(entry['key_length'])].decode('utf-8')
+
+    def _find(self, key: str) -> Optional[np.void]:
+        target = key_hash(key)
+        position = np.searchsorted(self.index['key_hash'], np.uint64(target))
+        if position < len(self.index) and int(self.index[position]['key_hash']) == target:
+            entry = self.index[position]
+            if self._key(entry) == key:
+                return entry
+        return None
+
+    def _entry(self, key: str) -> np.void:
+        entry = self._find(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def palette(self, key: str) -> Optional[np.ndarray]:
+        """Zero-copy (colors, 4) uint8 palette of an indexed sprite, or None for RGBA."""
+        entry = self._entry(key)
+        if entry['format'] != FORMAT_INDEXED:
+            return None
+        return np.frombuffer(self._mmap, dtype=np.uint8, count=int(entry['palette_count']) * 4,
+                             offset=int(entry['offset'])).reshape(-1, 4)
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        """
+        Zero-copy view of a sprite's stored pixels.
+
+        Returns (height, width, 4) RGBA for RGBA sprites and (height, width)
+        palette indices for indexed sprites (see `palette` and `rgba`).
+        """
+        entry = self._entry(key)
+        width, height = int(entry['width']), int(entry['height'])
+        if entry['format'] == FORMAT_INDEXED:
+            offset = int(entry['offset']) + _align(int(entry['palette_count']) * 4)
+            return np.frombuffer(self._mmap, dtype=np.uint8, count=width * height,
+                                 offset=offset).reshape(height, width)
+        return np.frombuffer(self._mmap, dtype=np.uint8, count=width * height * 4,
+                             offset=int(entry['offset'])).reshape(height, width, 4)
+
+    def rgba(self, key: str) -> np.ndarray:
+        """RGBA pixels of any sprite; a view for RGBA sprites, a palette gather for indexed ones."""
+        pixels = self[key]
+        palette = self.palette(key)
+        return pixels if palette is None else palette[pixels]
+
+    def image(self, key: str) -> Image.Image:
+        """Decode a sprite into a PIL image (copies the pixels)."""
+        return Image.fromarray(np.ascontiguousarray(self.rgba(key)), 'RGBA')
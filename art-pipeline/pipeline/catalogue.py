@@ -0,0 +1,93 @@
+"""
+Sprite Catalogue and Manifest Handling
+
+Flattens the nested sprite dicts produced by the generators into a single
+catalogue keyed by output path (e.g. 'monsters/ghost_float_0'), writes the
+encoded PNGs and records them in a JSON manifest.
+"""
+
+import hashlib
+import io
+import json
+from pathlib import Path
+from typing import Dict, Iterable
+
+from PIL import Image
+
+# Manifest file written next to the sprite directories
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+def flatten_catalogue(character_sprites: Dict, monster_sprites: Dict,
+                      environment_sprites: Dict) -> Dict[str, Image.Image]:
+    """
+    Flatten generator output into a catalogue keyed by '<category>/<name>'.
+
+    Keys follow the file layout used by `save_sprites_to_output`.
+    """
+    catalogue = {}
+    for name, sprite in character_sprites.items():
+        if sprite:
+            catalogue[f'characters/{name}'] = sprite
+    for monster_type, sprites in monster_sprites.items():
+        for name, sprite in sprites.items():
+            if sprite:
+                catalogue[f'monsters/{monster_type}_{name}'] = sprite
+    for category, sprites in environment_sprites.items():
+        for name, sprite in sprites.items():
+            if sprite:
+                catalogue[f'environment/{category}_{name}'] = sprite
+    return catalogue
+
+def encode_sprite(sprite: Image.Image, optimize: bool = True) -> bytes:
+    """Encode a sprite as PNG bytes."""
+    buffer = io.BytesIO()
+    sprite.save(buffer, 'PNG', optimize=optimize)
+    return buffer.getvalue()
+
+def catalogue_digest(keys: Iterable[str]) -> str:
+    """Stable digest of a set of sprite keys, independent of order."""
+    return hashlib.sha256('\n'.join(sorted(keys)).encode('utf-8')).hexdigest()
+
+def manifest_entry(key: str, sprite: Image.Image, data: bytes) -> Dict:
+    """Describe one encoded sprite for the manifest."""
+    return {
+        'file': f'{key}.png',
+        'width': sprite.width,
+        'height': sprite.height,
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+
+def write_sprites(catalogue: Dict[str, Image.Image], out_dir: Path,
+                  optimize: bool = True) -> Dict[str, Dict]:
+    """
+    Encode and write every catalogue sprite under `out_dir`.
+
+    Returns:
+        Manifest entries keyed by sprite key
+    """
+    entries = {}
+    for key, sprite in catalogue.items():
+        data = encode_sprite(sprite, optimize)
+        filepath = out_dir / f'{key}.png'
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_bytes(data)
+        entries[key] = manifest_entry(key, sprite, data)
+    return entries
+
+def build_manifest(entries: Dict[str, Dict], **extra) -> Dict:
+    """Assemble a manifest with entries in sorted key order."""
+    manifest = {'version': MANIFEST_VERSION, **extra}
+    manifest['sprites'] = {key: entries[key] for key in sorted(entries)}
+    return manifest
+
+def write_manifest(manifest: Dict, out_dir: Path) -> Path:
+    """Write a manifest deterministically (sorted keys, no timestamps)."""
+    path = out_dir / MANIFEST_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    return path
+
+def load_manifest(out_dir: Path) -> Dict:
+    """Read the manifest from an output directory."""
+    return json.loads((out_dir / MANIFEST_NAME).read_text(encoding='utf-8'))
@@ -0,0 +1,154 @@
+"""
+Normal Maps for Phaser Light2D
+
+Derives a normal map for wall, floor and monster sprites so the game can
+light them per pixel with Phaser's Light2D pipeline instead of faking it at
+runtime. A height field is inferred from each sprite's luminance and alpha
+(with optional per-color heights and smoothing), and normals follow from
+its Sobel gradients. Same-sized sprites sharing a style are computed as one
+NumPy batch.
+
+Normals are encoded as RGB = (n + 1) / 2 with red pointing right, green
+pointing up and blue out of the screen; alpha copies the sprite's alpha.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from PIL import Image
+import numpy as np
+
+# Phaser's convention for a texture's companion normal map file
+NORMAL_SUFFIX = '_n'
+
+# Default height-field style; per-family styles override these keys
+DEFAULT_STYLE = {
+    'strength': 4.0,     # Slope scale, higher gives deeper relief
+    'luminance': 1.0,    # Weight of brightness in the height (0 = flat alpha plateau)
+    'invert': False,     # Treat dark pixels as raised instead of recessed
+    'heights': {},       # Exact RGB color -> height in [0, 1], overriding brightness
+    'smooth': 0,         # 3x3 box-blur passes over the height field (rounds silhouettes)
+    'wrap': False,       # Sample across opposite edges, for seamless tiles
+}
+
+# Rec. 601 luma weights
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# Tile categories that get normal maps (monsters always do)
+NORMAL_MAP_TILE_CATEGORIES = ('floors', 'walls')
+
+def normal_key(key: str) -> str:
+    """Catalogue key of a sprite's normal map, e.g. 'monsters/ghost_float_0_n'."""
+    return f'{key}{NORMAL_SUFFIX}'
+
+def resolve_style(name: str, overrides: Dict[str, Dict], base: Optional[Dict] = None) -> Dict:
+    """
+    Style for one sprite: `base` plus the override for its family.
+
+    The family is the longest override key equal to `name` or a prefix of
+    it followed by '_', so 'wood_panel' also covers 'wood_panel_dark'.
+    """
+    matches = [family for family in overrides if name == family or name.startswith(f'{family}_')]
+    override = overrides[max(matches, key=len)] if matches else {}
+    return {**(base or {}), **override}
+
+def normal_map_styles(keys: Iterable[str], monster_style: Dict, tile_style: Dict,
+                      tile_overrides: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Pick the height style for every wall, floor and monster sprite key.
+
+    Monsters share `monster_style`; tiles get `tile_style` plus their
+    family's entry in `tile_overrides`. Other keys get no normal map.
+    """
+    styles = {}
+    for key in keys:
+        category, name = key.split('/', 1)
+        tile_category, _, tile = name.partition('_')
+        if category == 'monsters':
+            styles[key] = monster_style
+        elif category == 'environment' and tile_category in NORMAL_MAP_TILE_CATEGORIES:
+            styles[key] = resolve_style(tile, tile_overrides, tile_style)
+    return styles
+
+def _pad(field: np.ndarray, wrap: bool) -> np.ndarray:
+    return np.pad(field, ((0, 0), (1, 1), (1, 1)), mode='wrap' if wrap else 'edge')
+
+def height_fields(pixels: np.ndarray, style: Dict) -> np.ndarray:
+    """
+    Infer heights in [0, 1] for a batch of RGBA sprites.
+
+    Args:
+        pixels: uint8 array of shape (sprites, height, width, 4)
+
+    Returns:
+        float32 array of shape (sprites, height, width)
+    """
+    alpha = pixels[..., 3].astype(np.float32) / 255.0
+    luminance = pixels[..., :3].astype(np.float32) @ LUMA / 255.0
+    if style['invert']:
+        luminance = 1.0 - luminance
+    height = (1.0 - style['luminance']) + style['luminance'] * luminance
+
+    for color, value in style['heights'].items():
+        height[(pixels[..., :3] == color[:3]).all(axis=-1)] = value
+
+    height *= alpha
+    for _ in range(style['smooth']):
+        padded = _pad(height, style['wrap'])
+        height = sum(padded[:, dy:dy + height.shape[1], dx:dx + height.shape[2]]
+                     for dy in range(3) for dx in range(3)) / 9.0
+    return height
+
+def sobel_gradients(height: np.ndarray, wrap: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sobel gradients of a batch of height fields, in height units per pixel.
+
+    Returns:
+        (dx, dy) with dy measured down the image
+    """
+    p = _pad(height, wrap)
+    dx = ((p[:, :-2, 2:] + 2 * p[:, 1:-1, 2:] + p[:, 2:, 2:])
+          - (p[:, :-2, :-2] + 2 * p[:, 1:-1, :-2] + p[:, 2:, :-2])) / 8.0
+    dy = ((p[:, 2:, :-2] + 2 * p[:, 2:, 1:-1] + p[:, 2:, 2:])
+          - (p[:, :-2, :-2] + 2 * p[:, :-2, 1:-1] + p[:, :-2, 2:])) / 8.0
+    return dx, dy
+
+def normal_pixels(pixels: np.ndarray, style: Dict) -> np.ndarray:
+    """Encode normal maps for a batch of same-sized sprites sharing one style."""
+    style = {**DEFAULT_STYLE, **style}
+    dx, dy = sobel_gradients(height_fields(pixels, style), style['wrap'])
+
+    # The surface faces away from where it rises; image y runs down, green runs up
+    normals = np.stack([-dx * style['strength'], dy * style['strength'], np.ones_like(dx)], axis=-1)
+    normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+
+    encoded = np.empty(pixels.shape, dtype=np.uint8)
+    encoded[..., :3] = np.rint((normals + 1.0) * 127.5)
+    encoded[..., 3] = pixels[..., 3]
+    return encoded
+
+def _style_key(style: Dict) -> Tuple:
+    style = {**DEFAULT_STYLE, **style}
+    heights = tuple(sorted((tuple(color), value) for color, value in style['heights'].items()))
+    return (style['strength'], style['luminance'], style['invert'], heights,
+            style['smooth'], style['wrap'])
+
+def build_normal_maps(catalogue: Dict[str, Image.Image], styles: Dict[str, Dict]) -> Dict[str, Image.Image]:
+    """
+    Compute normal maps for every catalogue sprite that has a style.
+
+    Returns:
+        Normal map images keyed by the sprite's catalogue key
+    """
+    groups = {}
+    for key, sprite in catalogue.items():
+        if styles.get(key) is None:
+            continue
+        groups.setdefault((sprite.size, _style_key(styles[key])), []).append(key)
+
+    normals = {}
+    for (size, _), keys in groups.items():
+        pixels = np.stack([np.asarray(catalogue[key].convert('RGBA')) for key in keys])
+        for key, frame in zip(keys, normal_pixels(pixels, styles[keys[0]])):
+            normals[key] = Image.fromarray(frame, 'RGBA')
+
+    return {key: normals[key] for key in catalogue if key in normals}
@@ -0,0 +1,329 @@
+"""
+On-Demand Sprite Render Server
+
+A small stdlib HTTP server for live palette tuning. Sprites are rendered
+when requested by calling the generator functions, so edits to the sprite
+modules show up on the next request without a full pipeline run:
+
+    GET /monsters/wraith/move_2.png?scale=4
+    GET /monsters/wraith_move_2.png            (same layout as public/assets/sprites)
+    GET /monsters/wraith_move_2_n.png          (its Light2D normal map)
+
+Encoded PNGs are kept in an LRU cache keyed by a hash of the generator
+sources plus the request parameters, and requests are handled by a fixed
+thread pool. Renders hold a shared lock on the generator modules and a
+reload waits for them to finish, so no render sees a half-reloaded module.
+"""
+
+import hashlib
+import importlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+from pipeline.catalogue import encode_sprite
+from pipeline.normals import NORMAL_SUFFIX, build_normal_maps, normal_map_styles
+
+# Generator modules, reloaded in dependency order when their sources change
+SPRITE_MODULES = (
+    'sprites.scheduler',
+    'sprites.compositing',
+    'sprites.light_sprites',
+    'sprites.outlining',
+    'sprites.antialiasing',
+    'sprites.palettes',
+    'sprites.character_sprites',
+    'sprites.monster_sprites',
+    'sprites.environment_sprites',
+)
+SPRITES_DIR = Path(__file__).resolve().parent.parent / 'sprites'
+
+# Environment categories returned by generate_environment_sprites
+ENVIRONMENT_CATEGORIES = ('floors', 'walls', 'furniture', 'interactive', 'decorative')
+
+MAX_SCALE = 16
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_WORKERS = 8
+
+class LRUCache:
+    """Thread-safe least-recently-used cache of encoded sprites."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value: bytes):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class ReadWriteLock:
+    """Lets many readers in at once, or a single writer; waiting writers go first."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._writing and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            self._condition.wait_for(lambda: not self._writing and not self._readers)
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+class SpriteRenderer:
+    """Renders single sprites on demand from the (hot-reloaded) generator modules."""
+
+    def __init__(self, cache: LRUCache = None):
+        self.cache = cache or LRUCache()
+        # Renders read the generator modules, reloads replace them
+        self._modules_lock = ReadWriteLock()
+        self._mtimes = None
+        self._source_hash = None
+        self._modules = {}
+
+    def source_hash(self) -> str:
+        """Hash of the generator sources, reloading the modules if they changed."""
+        sources = sorted(SPRITES_DIR.glob('*.py'))
+        mtimes = tuple((path.name, path.stat().st_mtime_ns) for path in sources)
+        if mtimes != self._mtimes:
+            with self._modules_lock.write():
+                # Another request may have reloaded while this one waited
+                if mtimes != self._mtimes:
+                    digest = hashlib.sha256()
+                    for path in sources:
+                        digest.update(path.read_bytes())
+                    for name in SPRITE_MODULES:
+                        module = importlib.import_module(name)
+                        # The first load is already fresh; later ones pick up edits
+                        self._modules[name] = importlib.reload(module) if self._mtimes else module
+                    self._mtimes = mtimes
+                    self._source_hash = digest.hexdigest()[:16]
+        return self._source_hash
+
+    def _family_renderer(self, category: str, family: str) -> Optional[Callable[[], Dict[str, Image.Image]]]:
+        """Find the generator call producing one family of a catalogue category."""
+        outline_catalogue = self._modules['sprites.outlining'].outline_catalogue
+        post_process_catalogue = self._modules['sprites.antialiasing'].post_process_catalogue
+        generate_palette_variants = self._modules['sprites.palettes'].generate_palette_variants
+        characters = self._modules['sprites.character_sprites']
+        monsters = self._modules['sprites.monster_sprites']
+        environment = self._modules['sprites.environment_sprites']
+
+        if category == 'characters':
+            return lambda: outline_catalogue({'characters': characters.generate_gas_huffer_sprites()},
+                                             {'characters': characters.CHARACTER_OUTLINE})['characters']
+
+        if category == 'monsters':
+            # Outline, palette swap, then anti-alias, in the same order as the pipeline
+            base, _, variant = family.partition('_')
+            if base not in monsters.MONSTER_BASE_COLORS:
+                return None
+            generate = getattr(monsters, f'generate_{base}_sprites')
+            render_outlined = lambda: outline_catalogue({base: generate()},
+                                                        {base: monsters.MONSTER_OUTLINES.get(base)})[base]
+            if not variant:
+                render = render_outlined
+            elif variant in monsters.MONSTER_PALETTES.get(base, {}):
+                render = lambda: generate_palette_variants(
+                    render_outlined(), monsters.MONSTER_BASE_COLORS[base],
+                    {variant: monsters.MONSTER_PALETTES[base][variant]})[variant]
+            else:
+                return None
+            return lambda: post_process_catalogue({family: render()},
+                                                  {family: monsters.monster_antialias_style(family)})[family]
+
+        if category == 'environment':
+            if family in ENVIRONMENT_CATEGORIES:
+                return lambda: environment.generate_environment_sprites()[family]
+            base, _, variant = family.partition('_')
+            if variant in environment.ENVIRONMENT_PALETTES.get(base, {}):
+                return lambda: generate_palette_variants(
+                    environment.generate_environment_sprites()[base],
+                    environment.ENVIRONMENT_BASE_COLORS[base],
+                    {variant: environment.ENVIRONMENT_PALETTES[base][variant]},
+                    changed_only=True)[variant]
+
+        return None
+
+    def render(self, category: str, family: str, name: str) -> Optional[Image.Image]:
+        """Render one sprite (or its '_n' normal map), or return None if no generator produces it."""
+        renderer = self._family_renderer(category, family)
+        if renderer is None:
+            return None
+        sprites = renderer()
+        if name in sprites or not name.endswith(NORMAL_SUFFIX):
+            return sprites.get(name)
+
+        sprite_name = name[:-len(NORMAL_SUFFIX)]
+        if sprites.get(sprite_name) is None:
+            return None
+        # Same catalogue key and style lookup as `generate_sprites.py --normals`
+        key = f'characters/{sprite_name}' if category == 'characters' else f'{category}/{family}_{sprite_name}'
+        monsters = self._modules['sprites.monster_sprites']
+        environment = self._modules['sprites.environment_sprites']
+        styles = normal_map_styles([key], monsters.MONSTER_NORMAL_STYLE, environment.TILE_NORMAL_STYLE,
+                                   environment.TILE_NORMAL_OVERRIDES)
+        return build_normal_maps({key: sprites[sprite_name]}, styles).get(key)
+
+    def resolve(self, path: str) -> Optional[Tuple[str, str, str]]:
+        """
+        Map a request path to (category, family, sprite name).
+
+        Accepts '/monsters/wraith/move_2.png' as well as the flat
+        '/monsters/wraith_move_2.png' layout written by the pipeline. A
+        normal map keeps its '_n' suffix in the sprite name.
+        """
+        parts = [part for part in path.strip('/').split('/') if part]
+        if not parts or not parts[-1].endswith('.png'):
+            return None
+        parts[-1] = parts[-1][:-len('.png')]
+
+        if parts[0] == 'characters' and len(parts) == 2:
+            return 'characters', 'characters', parts[1]
+        if parts[0] in ('monsters', 'environment') and len(parts) == 3:
+            return parts[0], parts[1], parts[2]
+        if parts[0] in ('monsters', 'environment') and len(parts) == 2:
+            # Flat names: the family is the longest prefix that has a generator
+            stem = parts[1]
+            for split in range(len(stem) - 1, 0, -1):
+                if stem[split] != '_':
+                    continue
+                family, name = stem[:split], stem[split + 1:]
+                if self._family_renderer(parts[0], family) is not None:
+                    return parts[0], family, name
+        return None
+
+    def png(self, path: str, scale: int = 1) -> Optional[bytes]:
+        """Return the encoded sprite for a request path, rendering it on a cache miss."""
+        self.source_hash()
+        with self._modules_lock.read():
+            # Read the hash under the lock so it matches the modules rendering
+            source_hash = self._source_hash
+            target = self.resolve(path)
+            if target is None:
+                return None
+
+            key = (source_hash, target, scale)
+            data = self.cache.get(key)
+            if data is None:
+                sprite = self.render(*target)
+                if sprite is None:
+                    return None
+                if scale != 1:
+                    sprite = sprite.resize((sprite.width * scale, sprite.height * scale), Image.NEAREST)
+                data = encode_sprite(sprite, optimize=False)
+                self.cache.put(key, data)
+            return data
+
+class SpriteRequestHandler(BaseHTTPRequestHandler):
+    """Serves rendered sprites as PNGs."""
+
+    server_version = 'GasHufferSprites/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            scale = int(parse_qs(url.query).get('scale', ['1'])[0])
+        except ValueError:
+            scale = 0
+        if not 1 <= scale <= MAX_SCALE:
+            self.send_error(400, f"scale must be an integer from 1 to {MAX_SCALE}")
+            return
+
+        try:
+            data = self.server.renderer.png(url.path, scale)
+        except Exception as error:  # Keep serving while a generator is mid-edit
+            self.send_error(500, f"Render failed: {error}")
+            return
+        if data is None:
+            self.send_error(404, f"No sprite generator for {url.path}")
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(data)
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """HTTPServer that handles each request on a fixed-size thread pool."""
+
+    def __init__(self, address, handler, renderer: SpriteRenderer, workers: int = DEFAULT_WORKERS):
+        super().__init__(address, handler)
+        self.renderer = renderer
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sprite-render')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+def serve(host: str = '127.0.0.1', port: int = 8765, workers: int = DEFAULT_WORKERS,
+          cache_size: int = DEFAULT_CACHE_SIZE):
+    """Run the render server until interrupted."""
+    server = ThreadPoolHTTPServer((host, port), SpriteRequestHandler,
+                                  SpriteRenderer(LRUCache(cache_size)), workers)
+    print(f"🖥️ Serving sprites on http://{host}:{port}/ with {workers} workers")
+    print(f"   e.g. http://{host}:{port}/monsters/wraith/move_2.png?scale=4")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
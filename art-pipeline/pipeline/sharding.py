@@ -0,0 +1,161 @@
+"""
+Sharded Catalogue Builds
+
+Splits the sprite catalogue into N stable shards by hashing sprite keys, so
+shards can be rendered and encoded on separate machines, and merges the
+shard outputs back into one directory with a verified manifest.
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from pipeline.catalogue import build_manifest, catalogue_digest, load_manifest, write_manifest
+
+class ShardMergeError(Exception):
+    """Raised when shard outputs cannot be merged into a complete catalogue."""
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse an 'i/N' shard spec into (index, count), with 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard spec '{spec}', expected 'i/N' (e.g. '0/4')")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard spec '{spec}', need 0 <= i < N")
+    return index, count
+
+def shard_of(key: str, count: int) -> int:
+    """Stable shard assignment for a sprite key (same on every machine and run)."""
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+def select_shard(catalogue: Dict[str, Image.Image], index: int, count: int) -> Dict[str, Image.Image]:
+    """Return the part of the catalogue that belongs to shard `index` of `count`."""
+    return {key: sprite for key, sprite in catalogue.items() if shard_of(key, count) == index}
+
+def shard_manifest(entries: Dict[str, Dict], index: int, count: int, catalogue_keys) -> Dict:
+    """Build a shard manifest recording which slice of which catalogue it holds."""
+    catalogue_keys = list(catalogue_keys)
+    return build_manifest(
+        entries,
+        shard={'index': index, 'count': count},
+        catalogue={'count': len(catalogue_keys), 'digest': catalogue_digest(catalogue_keys),
+                   'keys': sorted(catalogue_keys)},
+    )
+
+def _contained_path(root: Path, relative: str) -> Optional[Path]:
+    """Resolve a manifest file path under `root`, or None if it escapes `root`."""
+    root = root.resolve()
+    path = (root / relative).resolve()
+    return path if root in path.parents else None
+
+def _is_shard_manifest(manifest) -> bool:
+    """Whether a loaded manifest has the fields merge_shards relies on."""
+    if not isinstance(manifest, dict):
+        return False
+    shard, catalogue, sprites = manifest.get('shard'), manifest.get('catalogue'), manifest.get('sprites')
+    return (isinstance(shard, dict) and all(isinstance(shard.get(field), int) for field in ('index', 'count'))
+            and isinstance(catalogue, dict) and isinstance(catalogue.get('keys'), list)
+            and 'digest' in catalogue
+            and isinstance(sprites, dict)
+            and all(isinstance(entry, dict) and isinstance(entry.get('file'), str)
+                    and isinstance(entry.get('sha256'), str) for entry in sprites.values()))
+
+def load_shard_manifest(shard_dir: Path) -> Dict:
+    """
+    Read a shard directory's manifest.
+
+    Raises:
+        ShardMergeError: If the directory has no manifest or it isn't a shard manifest
+    """
+    try:
+        manifest = load_manifest(shard_dir)
+    except (OSError, ValueError):
+        manifest = None
+    if not _is_shard_manifest(manifest):
+        raise ShardMergeError(f"{shard_dir} is not a shard output")
+    return manifest
+
+def _key_list(keys) -> str:
+    keys = sorted(keys)
+    shown = ', '.join(keys[:5])
+    return f"{shown} and {len(keys) - 5} more" if len(keys) > 5 else shown
+
+def merge_shards(shard_dirs: List[Path], out_dir: Path) -> Dict:
+    """
+    Merge shard output directories into `out_dir`.
+
+    Verifies that every shard of the same catalogue is present exactly once,
+    that no sprite key appears in two shards or in the wrong shard, that
+    every listed file lies inside its shard directory and exists with its
+    recorded hash, and that together the shards hold exactly the catalogue's
+    sprites.
+
+    Returns:
+        The merged manifest
+
+    Raises:
+        ShardMergeError: If any check fails
+    """
+    manifests = [(Path(shard_dir), load_shard_manifest(Path(shard_dir))) for shard_dir in shard_dirs]
+    if not manifests:
+        raise ShardMergeError("No shard directories given")
+
+    count = manifests[0][1]['shard']['count']
+    catalogue = manifests[0][1]['catalogue']
+    seen_shards = {}
+    for shard_dir, manifest in manifests:
+        if manifest['shard']['count'] != count or manifest['catalogue'] != catalogue:
+            raise ShardMergeError(f"{shard_dir} belongs to a different sharded build")
+        index = manifest['shard']['index']
+        if index in seen_shards:
+            raise ShardMergeError(f"Shard {index}/{count} given twice: {seen_shards[index]} and {shard_dir}")
+        seen_shards[index] = shard_dir
+
+    missing_shards = sorted(set(range(count)) - set(seen_shards))
+    if missing_shards:
+        raise ShardMergeError(f"Missing shards: {', '.join(f'{i}/{count}' for i in missing_shards)}")
+
+    # Check every entry before copying anything
+    owners = {}
+    for shard_dir, manifest in manifests:
+        index = manifest['shard']['index']
+        for key, entry in manifest['sprites'].items():
+            if key in owners:
+                raise ShardMergeError(f"Sprite '{key}' collides between {owners[key]} and {shard_dir}")
+            if shard_of(key, count) != index:
+                raise ShardMergeError(f"Sprite '{key}' is in shard {index} but hashes to {shard_of(key, count)}")
+            filepath = _contained_path(shard_dir, entry['file'])
+            if filepath is None or _contained_path(out_dir, entry['file']) is None:
+                raise ShardMergeError(f"Sprite '{key}' file '{entry['file']}' is outside {shard_dir}")
+            if not filepath.is_file():
+                raise ShardMergeError(f"Sprite '{key}' is missing its file {filepath}")
+            if hashlib.sha256(filepath.read_bytes()).hexdigest() != entry['sha256']:
+                raise ShardMergeError(f"Sprite '{key}' does not match its recorded hash in {filepath}")
+            owners[key] = shard_dir
+
+    missing = set(catalogue['keys']) - set(owners)
+    unexpected = set(owners) - set(catalogue['keys'])
+    if missing or unexpected:
+        problems = []
+        if missing:
+            problems.append(f"missing {_key_list(missing)}")
+        if unexpected:
+            problems.append(f"not in the catalogue: {_key_list(unexpected)}")
+        raise ShardMergeError(f"Shards don't match the catalogue: {'; '.join(problems)}")
+
+    entries = {}
+    for shard_dir, manifest in manifests:
+        for key, entry in manifest['sprites'].items():
+            target = out_dir / entry['file']
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(shard_dir / entry['file'], target)
+            entries[key] = entry
+
+    merged = build_manifest(entries, catalogue=catalogue)
+    write_manifest(merged, out_dir)
+    return merged
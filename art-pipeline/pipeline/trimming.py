@@ -0,0 +1,68 @@
+"""
+Tight-Bounds Sprite Trimming
+
+Finds each sprite's alpha bounding box in one vectorized pass per sprite
+size and crops away the transparent border, keeping the source size and
+offset so the game can place the trimmed frame exactly where the full
+frame would have been.
+"""
+
+from typing import Dict, NamedTuple
+
+from PIL import Image
+import numpy as np
+
+class TrimmedSprite(NamedTuple):
+    """A cropped sprite plus where it sat inside its original frame."""
+    image: Image.Image
+    x: int              # Offset of the crop inside the source frame
+    y: int
+    source_width: int
+    source_height: int
+
+    @property
+    def trimmed(self) -> bool:
+        return self.image.size != (self.source_width, self.source_height)
+
+def alpha_bounds(pixels: np.ndarray) -> np.ndarray:
+    """
+    Compute alpha bounding boxes for a batch of same-sized RGBA sprites.
+
+    Args:
+        pixels: uint8 array of shape (sprites, height, width, 4)
+
+    Returns:
+        int array of shape (sprites, 4) holding (left, top, right, bottom),
+        right/bottom exclusive. Fully transparent sprites get a 1x1 box at
+        the origin so they still make a valid frame.
+    """
+    opaque = pixels[..., 3] > 0
+    rows = opaque.any(axis=2)
+    cols = opaque.any(axis=1)
+    height, width = opaque.shape[1:]
+
+    top = rows.argmax(axis=1)
+    bottom = height - rows[:, ::-1].argmax(axis=1)
+    left = cols.argmax(axis=1)
+    right = width - cols[:, ::-1].argmax(axis=1)
+
+    bounds = np.stack([left, top, right, bottom], axis=1)
+    empty = ~rows.any(axis=1)
+    bounds[empty] = (0, 0, 1, 1)
+    return bounds
+
+def trim_catalogue(catalogue: Dict[str, Image.Image]) -> Dict[str, TrimmedSprite]:
+    """Trim every sprite in a catalogue, batching sprites of the same size."""
+    groups = {}
+    for key, sprite in catalogue.items():
+        groups.setdefault(sprite.size, []).append(key)
+
+    trimmed = {}
+    for (width, height), keys in groups.items():
+        pixels = np.stack([np.asarray(catalogue[key].convert('RGBA')) for key in keys])
+        for key, frame, (left, top, right, bottom) in zip(keys, pixels, alpha_bounds(pixels)):
+            crop = Image.fromarray(np.ascontiguousarray(frame[top:bottom, left:right]), 'RGBA')
+            trimmed[key] = TrimmedSprite(crop, int(left), int(top), width, height)
+
+    # Keep catalogue order
+    return {key: trimmed[key] for key in catalogue}
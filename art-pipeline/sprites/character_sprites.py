@@ -9,17 +9,30 @@ from PIL import Image, ImageDraw
 import numpy as np
 from typing import Dict, List, Tuple
 
+try:
+    from sprites.scheduler import SpriteNode, render_graph
+except ImportError:  # Run directly as `python sprites/character_sprites.py`
+    from scheduler import SpriteNode, render_graph
+
 # Gas Huffer color palette - spooky green theme
 COLORS = {
     'bg': (0, 0, 0, 0),           # Transparent background
     'body_dark': (34, 80, 49),     # Dark green for body
     'body_light': (52, 120, 73),   # Light green for highlights
     'body_outline': (18, 40, 25),  # Very dark green outline
+    'body_outline_shadow': (8, 20, 12),  # Near-black outline on the shadow side
     'eye_white': (240, 240, 240),  # White for eyes
     'eye_pupil': (0, 0, 0),        # Black pupils
     'mouth': (120, 20, 20),        # Dark red for mouth
 }
 
+# Selective outline style: the whole outline comes from this stage, darker away from the light
+CHARACTER_OUTLINE = {
+    'color': COLORS['body_outline'],
+    'shadow_color': COLORS['body_outline_shadow'],
+    'light': 'top_left',
+}
+
 def generate_gas_huffer_sprites() -> Dict[str, Image.Image]:
     """
     Generate Gas Huffer character sprites with animations.
@@ -27,20 +40,31 @@ def generate_gas_huffer_sprites() -> Dict[str, Image.Image]:
     Returns:
         Dict containing sprite images for different states/animations
     """
-    sprites = {}
+    return render_graph(character_sprite_graph())
+
+def character_sprite_graph() -> Dict[str, SpriteNode]:
+    """
+    Declare every character sprite and the renders it builds on.
+    
+    All poses share one render of the base body.
+    """
+    graph = {}
+    
+    # Bare body, drawn once and shared by every pose
+    graph['base'] = SpriteNode(create_base_character, output=False)
     
     # Generate idle sprite
-    sprites['idle'] = create_gas_huffer_idle()
+    graph['idle'] = SpriteNode(create_gas_huffer_idle, ('base',))
     
     # Generate walk cycle (4 frames)
     for i in range(4):
-        sprites[f'walk_{i}'] = create_gas_huffer_walk(frame=i)
+        graph[f'walk_{i}'] = SpriteNode(lambda base, i=i: create_gas_huffer_walk(i, base), ('base',))
     
     # Generate flashlight poses
-    sprites['flashlight_idle'] = create_gas_huffer_flashlight_idle()
-    sprites['flashlight_walk'] = create_gas_huffer_flashlight_walk()
+    graph['flashlight_idle'] = SpriteNode(create_gas_huffer_flashlight_idle, ('base',))
+    graph['flashlight_walk'] = SpriteNode(create_gas_huffer_flashlight_walk, ('flashlight_idle',))
     
-    return sprites
+    return graph
 
 def create_base_character(size: Tuple[int, int] = (32, 32)) -> Image.Image:
     """Create the base Gas Huffer character sprite."""
@@ -65,11 +89,6 @@ def create_base_character(size: Tuple[int, int] = (32, 32)) -> Image.Image:
                 continue  # Round corners
             draw.point((x, y), COLORS['body_light'])
     
-    # Head outline
-    head_outline = [(13, 8), (19, 8), (20, 9), (20, 11), (19, 12), (13, 12), (12, 11), (12, 9)]
-    for point in head_outline:
-        draw.point(point, COLORS['body_outline'])
-    
     # Eyes
     draw.point((15, 10), COLORS['eye_white'])
     draw.point((17, 10), COLORS['eye_white'])
@@ -84,14 +103,6 @@ def create_base_character(size: Tuple[int, int] = (32, 32)) -> Image.Image:
         for y in range(13, 21):
             draw.point((x, y), COLORS['body_dark'])
     
-    # Body outline
-    for x in range(14, 19):
-        draw.point((x, 13), COLORS['body_outline'])  # Top
-        draw.point((x, 20), COLORS['body_outline'])  # Bottom
-    for y in range(13, 21):
-        draw.point((14, y), COLORS['body_outline'])  # Left
-        draw.point((18, y), COLORS['body_outline'])  # Right
-    
     # Arms (simple lines)
     draw.point((12, 15), COLORS['body_dark'])  # Left arm
     draw.point((11, 16), COLORS['body_dark'])
@@ -109,13 +120,13 @@ def create_base_character(size: Tuple[int, int] = (32, 32)) -> Image.Image:
     
     return img
 
-def create_gas_huffer_idle() -> Image.Image:
+def create_gas_huffer_idle(base: Image.Image = None) -> Image.Image:
     """Create the idle Gas Huffer sprite."""
-    return create_base_character()
+    return base if base is not None else create_base_character()
 
-def create_gas_huffer_walk(frame: int) -> Image.Image:
-    """Create walking animation frame."""
-    img = create_base_character()
+def create_gas_huffer_walk(frame: int, base: Image.Image = None) -> Image.Image:
+    """Create walking animation frame, drawing over `base` if given."""
+    img = base if base is not None else create_base_character()
     
     # Simple walk cycle by slightly moving legs
     if frame in [1, 3]:
@@ -124,9 +135,9 @@ def create_gas_huffer_walk(frame: int) -> Image.Image:
     
     return img
 
-def create_gas_huffer_flashlight_idle() -> Image.Image:
-    """Create Gas Huffer holding flashlight (idle)."""
-    img = create_base_character()
+def create_gas_huffer_flashlight_idle(base: Image.Image = None) -> Image.Image:
+    """Create Gas Huffer holding flashlight (idle), drawing over `base` if given."""
+    img = base if base is not None else create_base_character()
     draw = ImageDraw.Draw(img)
     
     # Add flashlight to right hand
@@ -137,9 +148,11 @@ def create_gas_huffer_flashlight_idle() -> Image.Image:
     
     return img
 
-def create_gas_huffer_flashlight_walk() -> Image.Image:
+def create_gas_huffer_flashlight_walk(flashlight_idle: Image.Image = None) -> Image.Image:
     """Create Gas Huffer holding flashlight (walking)."""
-    return create_gas_huffer_flashlight_idle()  # Basic implementation
+    if flashlight_idle is None:
+        flashlight_idle = create_gas_huffer_flashlight_idle()
+    return flashlight_idle  # Basic implementation
 
 if __name__ == "__main__":
     sprites = generate_gas_huffer_sprites()
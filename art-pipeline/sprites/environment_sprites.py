@@ -9,6 +9,15 @@ from PIL import Image, ImageDraw
 import numpy as np
 from typing import Dict, List, Tuple
 
+try:
+    from sprites.outlining import apply_outlines
+    from sprites.palettes import generate_palette_variants
+    from sprites.scheduler import SpriteNode, render_graph
+except ImportError:  # Run directly as `python sprites/environment_sprites.py`
+    from outlining import apply_outlines
+    from palettes import generate_palette_variants
+    from scheduler import SpriteNode, render_graph
+
 # Environment color palettes - haunted manor theme
 FLOOR_COLORS = {
     'bg': (0, 0, 0, 0),           # Transparent background
@@ -20,13 +29,23 @@ FLOOR_COLORS = {
     'carpet_red': (80, 30, 30),   # Dark red carpet
 }
 
+# Stone tiles are fully opaque, so their mortar border is an inner outline
+STONE_TILE_OUTLINE = {
+    'color': FLOOR_COLORS['wood_outline'],
+    'shadow_color': FLOOR_COLORS['wood_outline'],
+    'placement': 'inner',
+}
+
 WALL_COLORS = {
     'bg': (0, 0, 0, 0),           # Transparent background
     'wallpaper_dark': (40, 45, 35),  # Dark green wallpaper
     'wallpaper_light': (55, 65, 45), # Light green wallpaper  
     'wallpaper_pattern': (30, 35, 25), # Pattern color
     'stone_wall': (70, 65, 60),    # Stone wall
+    'mortar': (50, 50, 45),        # Mortar between stone blocks
+    'moss': (40, 60, 30),          # Moss on old stone
     'wood_panel': (55, 45, 35),    # Wood paneling
+    'panel_seam': (30, 25, 20),    # Gaps between wood panels
 }
 
 FURNITURE_COLORS = {
@@ -48,6 +67,42 @@ INTERACTIVE_COLORS = {
     'door_wood': (50, 35, 25),    # Door wood
 }
 
+# Named palette-swap variants for tile categories, as overrides on the base palettes
+ENVIRONMENT_BASE_COLORS = {
+    'floors': FLOOR_COLORS,
+    'walls': WALL_COLORS,
+}
+
+ENVIRONMENT_PALETTES = {
+    'floors': {
+        'blue_carpet': {'carpet_red': (30, 40, 80)},   # Guest bedroom
+        'pale_stone': {                                # Moonlit cellar
+            'stone_dark': (75, 78, 85),
+            'stone_light': (100, 104, 112),
+        },
+    },
+}
+
+# Normal-map height styles (see pipeline/normals.py) for floor and wall tiles
+TILE_NORMAL_STYLE = {
+    'wrap': True,                     # Tiles repeat, so gradients wrap around
+}
+
+# Per-family overrides, matched by tile name prefix ('wood_panel' covers 'wood_panel_dark')
+TILE_NORMAL_OVERRIDES = {
+    'stone_wall': {
+        'heights': {WALL_COLORS['mortar']: 0.0},   # Mortar lines are grooves
+    },
+    'stone_wall_mossy': {
+        'heights': {WALL_COLORS['mortar']: 0.0, WALL_COLORS['moss']: 0.6},  # Moss sits on the stone
+    },
+    'wood_panel': {
+        'luminance': 0.3,                 # Lighter boards aren't raised boards
+        'heights': {WALL_COLORS['panel_seam']: 0.0},   # Panel seams are grooves
+        'strength': 3.0,
+    },
+}
+
 def generate_environment_sprites() -> Dict[str, Dict[str, Image.Image]]:
     """
     Generate all environment sprites for the haunted manor.
@@ -55,15 +110,39 @@ def generate_environment_sprites() -> Dict[str, Dict[str, Image.Image]]:
     Returns:
         Dict containing sprite images organized by category
     """
-    environment = {
-        'floors': generate_floor_tiles(),
-        'walls': generate_wall_tiles(),
-        'furniture': generate_furniture_sprites(),
-        'interactive': generate_interactive_objects(),
-        'decorative': generate_decorative_elements(),
+    return render_graph(environment_sprite_graph())
+
+def environment_sprite_graph() -> Dict[str, SpriteNode]:
+    """
+    Declare the environment categories for the scheduler.
+    
+    Tiles don't build on each other, so each category is one independent node.
+    """
+    return {
+        'floors': SpriteNode(generate_floor_tiles),
+        'walls': SpriteNode(generate_wall_tiles),
+        'furniture': SpriteNode(generate_furniture_sprites),
+        'interactive': SpriteNode(generate_interactive_objects),
+        'decorative': SpriteNode(generate_decorative_elements),
     }
+
+def generate_environment_variants(environment: Dict[str, Dict[str, Image.Image]]) -> Dict[str, Dict[str, Image.Image]]:
+    """
+    Recolor tile categories into every palette in ENVIRONMENT_PALETTES.
+    
+    Only tiles the variant palette actually changes are included.
     
-    return environment
+    Returns:
+        Dict keyed '<category>_<variant>' with the same tile names as the base category
+    """
+    variants = {}
+    for category, palettes in ENVIRONMENT_PALETTES.items():
+        recolored = generate_palette_variants(environment[category], ENVIRONMENT_BASE_COLORS[category],
+                                              palettes, changed_only=True)
+        for variant_name, tiles in recolored.items():
+            variants[f'{category}_{variant_name}'] = tiles
+    
+    return variants
 
 def generate_floor_tiles() -> Dict[str, Image.Image]:
     """Generate floor tile sprites (16x16)."""
@@ -203,15 +282,8 @@ def create_stone_tile(variation: int = 0) -> Image.Image:
                 if (x // 8 + y // 8) % 2 == 0 and (x + y) % 2 == 0:
                     draw.point((x, y), light_color)
     
-    # Stone borders
-    for x in range(16):
-        draw.point((x, 0), FLOOR_COLORS['wood_outline'])  # Top
-        draw.point((x, 15), FLOOR_COLORS['wood_outline']) # Bottom
-    for y in range(16):
-        draw.point((0, y), FLOOR_COLORS['wood_outline'])  # Left
-        draw.point((15, y), FLOOR_COLORS['wood_outline']) # Right
-    
-    return img
+    # Stone borders traced along the tile edge
+    return apply_outlines([img], STONE_TILE_OUTLINE)[0]
 
 def create_carpet_tile(pattern: bool = False) -> Image.Image:
     """Create carpet floor tile."""
@@ -286,17 +358,18 @@ def create_stone_wall_tile(mossy: bool = False) -> Image.Image:
     
     if mossy:
         # Add moss texture
-        moss_color = (40, 60, 30)
+        moss_color = WALL_COLORS['moss']
         for x in range(16):
             for y in range(16):
                 if (x + y * 3) % 7 == 0:
                     draw.point((x, y), moss_color)
     
     # Stone mortar lines
+    mortar_color = WALL_COLORS['mortar']
     for x in range(16):
-        draw.point((x, 7), (50, 50, 45))   # Horizontal line
+        draw.point((x, 7), mortar_color)   # Horizontal line
     for y in range(16):
-        draw.point((7, y), (50, 50, 45))   # Vertical line
+        draw.point((7, y), mortar_color)   # Vertical line
     
     return img
 
@@ -323,7 +396,7 @@ def create_wood_panel_tile(dark: bool = False) -> Image.Image:
     # Panel separation lines
     for x in range(3, 16, 4):
         for y in range(16):
-            draw.point((x, y), (30, 25, 20))
+            draw.point((x, y), WALL_COLORS['panel_seam'])
     
     # Wood grain
     for x in range(16):
@@ -0,0 +1,173 @@
+"""
+Flashlight Light Texture Generation for Gas Huffer
+
+Pre-bakes the light textures the game blits to light rooms: flashlight cone
+masks at quantized angles, radial falloff gradients and dithered pixel-art
+light bands in the spooky palette. Every set is computed as one NumPy field
+covering all of its frames.
+"""
+
+from PIL import Image
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Light palette - sickly green flashlight glow
+LIGHT_COLORS = {
+    'bg': (0, 0, 0, 0),              # Transparent background
+    'mask': (255, 255, 255, 255),    # Solid cone mask for visibility tests
+    'falloff': (220, 235, 160),      # Smooth gradient color, alpha carries intensity
+    'band_dim': (60, 90, 40, 70),    # Outer dithered band
+    'band_mid': (140, 170, 80, 120), # Middle band
+    'band_bright': (230, 240, 170, 170), # Hot spot near the lens
+}
+
+# Dithered bands from dimmest to brightest
+LIGHT_BANDS = ('band_dim', 'band_mid', 'band_bright')
+
+# Flashlight cone settings
+CONE_SIZE = 64                 # Texture size, the lens sits at the center
+CONE_RADIUS = 31               # Beam reach in pixels
+CONE_HALF_ANGLE = 25.0         # Half of the beam spread, in degrees
+CONE_ANGLE_STEPS = 16          # Quantized directions around the circle
+
+# Radial falloff (ambient glow) diameters
+FALLOFF_SIZES = (16, 32, 64)
+
+def generate_light_sprites() -> Dict[str, Dict[str, Image.Image]]:
+    """
+    Generate all pre-baked light textures.
+
+    Returns:
+        Dict containing light textures organized by set
+    """
+    angles = cone_angles()
+
+    lights = {
+        'cone': {},
+        'radial': {},
+    }
+
+    for angle, mask, lit in zip(angles, create_cone_masks(angles), create_cone_bands(angles)):
+        lights['cone'][f'mask_{angle_label(angle)}'] = mask
+        lights['cone'][f'lit_{angle_label(angle)}'] = lit
+
+    for size in FALLOFF_SIZES:
+        lights['radial'][f'falloff_{size}'] = create_radial_falloff(size)
+        lights['radial'][f'lit_{size}'] = create_radial_bands(size)
+
+    return lights
+
+def cone_angles(steps: int = CONE_ANGLE_STEPS) -> List[float]:
+    """Quantized cone directions in degrees, 0 = facing right, clockwise on screen."""
+    return [i * 360.0 / steps for i in range(steps)]
+
+def angle_label(angle: float) -> str:
+    """Sprite name suffix for an angle, e.g. 22.5 -> '022_5'."""
+    return f'{angle:05.1f}'.replace('.', '_')
+
+def light_metadata() -> Dict[str, Dict[str, Dict]]:
+    """
+    Describe every light texture for the atlas JSON.
+
+    Returns:
+        Dict mirroring generate_light_sprites() with per-texture metadata
+    """
+    metadata = {'cone': {}, 'radial': {}}
+    for angle in cone_angles():
+        for kind in ('mask', 'lit'):
+            metadata['cone'][f'{kind}_{angle_label(angle)}'] = {
+                'type': f'cone_{kind}',
+                'angle_degrees': angle,
+                'angle_radians': round(float(np.radians(angle)), 6),
+                'half_angle_degrees': CONE_HALF_ANGLE,
+                'radius': CONE_RADIUS,
+                'origin': {'x': CONE_SIZE // 2, 'y': CONE_SIZE // 2},
+            }
+    for size in FALLOFF_SIZES:
+        for kind in ('falloff', 'lit'):
+            metadata['radial'][f'{kind}_{size}'] = {
+                'type': f'radial_{kind}',
+                'radius': size / 2,
+                'origin': {'x': size // 2, 'y': size // 2},
+            }
+    return metadata
+
+def bayer_matrix(size: int = 4) -> np.ndarray:
+    """Ordered-dither thresholds in [0, 1) for a power-of-two Bayer matrix."""
+    matrix = np.zeros((1, 1), dtype=np.float32)
+    while matrix.shape[0] < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2],
+                           [4 * matrix + 3, 4 * matrix + 1]])
+    return (matrix + 0.5) / matrix.size
+
+def dither_bands(intensity: np.ndarray, levels: int) -> np.ndarray:
+    """
+    Quantize intensities in [0, 1] to band indices 0..levels with Bayer dithering.
+
+    Band 0 is unlit; the dither pattern is tiled across the last two axes.
+    """
+    height, width = intensity.shape[-2:]
+    thresholds = bayer_matrix(4)
+    thresholds = np.tile(thresholds, (height // 4 + 1, width // 4 + 1))[:height, :width]
+    bands = np.floor(intensity * levels + thresholds).astype(np.int32)
+    bands[intensity <= 0] = 0
+    return np.clip(bands, 0, levels)
+
+def bands_to_images(bands: np.ndarray) -> List[Image.Image]:
+    """Color band indices with the LIGHT_BANDS palette."""
+    palette = np.array([LIGHT_COLORS['bg']] + [LIGHT_COLORS[name] for name in LIGHT_BANDS], dtype=np.uint8)
+    return [Image.fromarray(frame, 'RGBA') for frame in palette[bands]]
+
+def _cone_fields(angles: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Radial distance (0-1 of the beam reach) and angular offset (degrees) for every angle."""
+    ys, xs = np.mgrid[0:CONE_SIZE, 0:CONE_SIZE].astype(np.float32)
+    dx = xs + 0.5 - CONE_SIZE / 2
+    dy = ys + 0.5 - CONE_SIZE / 2
+    distance = np.hypot(dx, dy)[np.newaxis] / CONE_RADIUS
+
+    direction = np.degrees(np.arctan2(dy, dx))[np.newaxis]
+    offset = direction - np.array(angles, dtype=np.float32)[:, None, None]
+    offset = np.abs((offset + 180.0) % 360.0 - 180.0)
+    return distance, offset
+
+def create_cone_masks(angles: List[float]) -> List[Image.Image]:
+    """Create hard-edged flashlight cone masks for every angle at once."""
+    distance, offset = _cone_fields(angles)
+    inside = (distance <= 1.0) & (offset <= CONE_HALF_ANGLE)
+
+    pixels = np.zeros(inside.shape + (4,), dtype=np.uint8)
+    pixels[inside] = LIGHT_COLORS['mask']
+    return [Image.fromarray(frame, 'RGBA') for frame in pixels]
+
+def create_cone_bands(angles: List[float]) -> List[Image.Image]:
+    """Create dithered, banded flashlight beams for every angle at once."""
+    distance, offset = _cone_fields(angles)
+
+    # Bright near the lens and along the beam axis, fading to the edges
+    radial = np.clip(1.0 - distance, 0.0, 1.0) ** 0.8
+    angular = np.clip(1.0 - offset / CONE_HALF_ANGLE, 0.0, 1.0) ** 0.5
+    intensity = radial * angular
+
+    return bands_to_images(dither_bands(intensity, len(LIGHT_BANDS)))
+
+def _radial_intensity(size: int) -> np.ndarray:
+    ys, xs = np.mgrid[0:size, 0:size].astype(np.float32)
+    distance = np.hypot(xs + 0.5 - size / 2, ys + 0.5 - size / 2) / (size / 2)
+    return np.clip(1.0 - distance, 0.0, 1.0) ** 1.5
+
+def create_radial_falloff(size: int) -> Image.Image:
+    """Create a smooth radial falloff gradient with intensity in the alpha channel."""
+    intensity = _radial_intensity(size)
+    pixels = np.zeros((size, size, 4), dtype=np.uint8)
+    pixels[..., :3] = LIGHT_COLORS['falloff']
+    pixels[..., 3] = np.rint(intensity * 255).astype(np.uint8)
+    return Image.fromarray(pixels, 'RGBA')
+
+def create_radial_bands(size: int) -> Image.Image:
+    """Create a dithered pixel-art version of the radial falloff."""
+    return bands_to_images(dither_bands(_radial_intensity(size)[np.newaxis], len(LIGHT_BANDS)))[0]
+
+if __name__ == "__main__":
+    lights = generate_light_sprites()
+    total_sprites = sum(len(sprites) for sprites in lights.values())
+    print(f"Generated {total_sprites} light textures across {len(lights)} sets")
@@ -7,13 +7,24 @@ following Derek Yu's pixel art methodology.
 
 from PIL import Image, ImageDraw
 import numpy as np
-from typing import Dict, List, Tuple
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from sprites.compositing import Layer, new_layer, frame_grid, frame_layers, paint, composite_to_images
+    from sprites.palettes import generate_palette_variants, palette_variant
+    from sprites.scheduler import SpriteNode, combine_graphs, render_graph, split_outputs
+except ImportError:  # Run directly as `python sprites/monster_sprites.py`
+    from compositing import Layer, new_layer, frame_grid, frame_layers, paint, composite_to_images
+    from palettes import generate_palette_variants, palette_variant
+    from scheduler import SpriteNode, combine_graphs, render_graph, split_outputs
 
 # Monster color palettes - spooky theme
 GHOST_COLORS = {
     'bg': (0, 0, 0, 0),           # Transparent background
     'body': (200, 200, 255, 180),  # Semi-transparent light blue
     'outline': (150, 150, 200, 220), # Slightly more opaque outline
+    'outline_shadow': (90, 90, 120, 220), # Outline on the unlit side
     'eyes': (255, 255, 255, 255),   # Solid white eyes
     'pupils': (0, 0, 0, 255),       # Solid black pupils
 }
@@ -23,6 +34,7 @@ SHADOW_COLORS = {
     'body': (20, 20, 30, 200),    # Dark purple-black
     'outline': (10, 10, 15, 255), # Very dark outline
     'eyes': (120, 0, 0, 200),     # Dark red eyes
+    'eyes_alert': (180, 0, 0, 255), # Brighter red eyes when alert
 }
 
 WRAITH_COLORS = {
@@ -41,6 +53,85 @@ POLTERGEIST_COLORS = {
     'effects': (255, 255, 255, 160), # White energy effects
 }
 
+# Base palette each monster family is rendered with
+MONSTER_BASE_COLORS = {
+    'ghost': GHOST_COLORS,
+    'shadow': SHADOW_COLORS,
+    'wraith': WRAITH_COLORS,
+    'poltergeist': POLTERGEIST_COLORS,
+}
+
+# Named palette-swap variants, as overrides on the base palettes
+MONSTER_PALETTES = {
+    'ghost': {
+        'ember': {
+            'body': (255, 170, 120, 180),
+            'outline': (200, 110, 70, 220),
+            'outline_shadow': (120, 66, 42, 220),
+        },
+    },
+    'shadow': {
+        'crimson': {
+            'body': (40, 10, 15, 200),
+            'eyes': (255, 40, 40, 230),
+            'eyes_alert': (255, 110, 110, 255),
+        },
+    },
+    'wraith': {
+        'frost': {
+            'body': (90, 130, 160, 160),
+            'wisp': (170, 220, 255, 120),
+            'eyes': (120, 220, 255, 220),
+        },
+    },
+    'poltergeist': {
+        'blue': {
+            'aura': (100, 140, 255, 80),
+            'core': (200, 220, 255, 120),
+            'outline': (50, 70, 150, 180),
+        },
+    },
+}
+
+# Shadow alert state is a palette swap of the idle pose
+SHADOW_ALERT_PALETTE = {
+    'eyes': SHADOW_COLORS['eyes_alert'],
+}
+
+# Per-monster outline styles for the selective outline stage (None = no outline)
+MONSTER_OUTLINES = {
+    'ghost': {
+        'color': GHOST_COLORS['outline'],
+        'shadow_color': GHOST_COLORS['outline_shadow'],
+        'skip': ('death',),           # Let the fading ghost dissolve
+    },
+    'shadow': {
+        'color': None,                # Lit side melts into the dark
+        'shadow_color': SHADOW_COLORS['outline'],
+        'skip': ('death',),
+    },
+    'wraith': None,                   # Wispy strands read better unoutlined
+    'poltergeist': None,              # Energy forms stay soft-edged
+}
+
+# Per-monster anti-aliasing styles for the post-process stage (None = leave hard-edged).
+# Dithering styles snap onto the family's own palette, see monster_antialias_style().
+MONSTER_ANTIALIAS = {
+    'ghost': {'skip': ('death',)},        # Smooth the oval body
+    'shadow': None,                       # Blocky silhouette has no curves
+    'wraith': None,                       # Strands are single pixels
+    'poltergeist': {                      # Smooth the round aura, sparkle the blended core
+        'dither': True,
+        'skip': ('death',),
+    },
+}
+
+# Normal-map height style (see pipeline/normals.py): a soft bulge from the silhouette
+MONSTER_NORMAL_STYLE = {
+    'luminance': 0.3,
+    'smooth': 2,
+}
+
 def generate_monster_sprites() -> Dict[str, Dict[str, Image.Image]]:
     """
     Generate all monster sprites with animations.
@@ -48,74 +139,129 @@ def generate_monster_sprites() -> Dict[str, Dict[str, Image.Image]]:
     Returns:
         Dict containing sprite images for each monster type and their states
     """
-    monsters = {
-        'ghost': generate_ghost_sprites(),
-        'shadow': generate_shadow_sprites(), 
-        'wraith': generate_wraith_sprites(),
-        'poltergeist': generate_poltergeist_sprites(),
-    }
-    
-    return monsters
+    return split_outputs(render_graph(monster_sprite_graph()))
+
+def monster_sprite_graph() -> Dict[str, SpriteNode]:
+    """Declare every monster sprite in one graph, nodes named '<monster>/<sprite>'."""
+    return combine_graphs({
+        'ghost': ghost_sprite_graph(),
+        'shadow': shadow_sprite_graph(),
+        'wraith': wraith_sprite_graph(),
+        'poltergeist': poltergeist_sprite_graph(),
+    })
 
 def generate_ghost_sprites() -> Dict[str, Image.Image]:
     """Generate Ghost monster sprites - predictable patrol routes."""
-    sprites = {}
+    return render_graph(ghost_sprite_graph())
+
+def generate_shadow_sprites() -> Dict[str, Image.Image]:
+    """Generate Shadow monster sprites - guards specific areas."""
+    return render_graph(shadow_sprite_graph())
+
+def generate_wraith_sprites() -> Dict[str, Image.Image]:
+    """Generate Wraith monster sprites - aggressive pursuit."""
+    return render_graph(wraith_sprite_graph())
+
+def generate_poltergeist_sprites() -> Dict[str, Image.Image]:
+    """Generate Poltergeist monster sprites - chaotic movement."""
+    return render_graph(poltergeist_sprite_graph())
+
+def ghost_sprite_graph() -> Dict[str, SpriteNode]:
+    """Declare the Ghost sprites and the renders they build on."""
+    graph = {}
     
-    # Generate floating animation frames
+    # Floating animation frames, composited in one pass
+    graph['float_frames'] = SpriteNode(lambda: create_ghost_float_frames(range(3)), output=False)
     for i in range(3):
-        sprites[f'float_{i}'] = create_ghost_float(frame=i)
+        graph[f'float_{i}'] = SpriteNode(itemgetter(i), ('float_frames',))
     
     # Death animation
-    sprites['death'] = create_ghost_death()
+    graph['death'] = SpriteNode(create_ghost_death)
     
-    return sprites
+    return graph
 
-def generate_shadow_sprites() -> Dict[str, Image.Image]:
-    """Generate Shadow monster sprites - guards specific areas."""
-    sprites = {}
+def shadow_sprite_graph() -> Dict[str, SpriteNode]:
+    """Declare the Shadow sprites and the renders they build on."""
+    graph = {}
     
     # Static guard pose
-    sprites['idle'] = create_shadow_idle()
+    graph['idle'] = SpriteNode(create_shadow_idle)
     
-    # Alert state
-    sprites['alert'] = create_shadow_alert()
+    # Alert state, recolored from the idle pose
+    graph['alert'] = SpriteNode(create_shadow_alert, ('idle',))
     
     # Death animation
-    sprites['death'] = create_shadow_death()
+    graph['death'] = SpriteNode(create_shadow_death)
     
-    return sprites
+    return graph
 
-def generate_wraith_sprites() -> Dict[str, Image.Image]:
-    """Generate Wraith monster sprites - aggressive pursuit."""
-    sprites = {}
+def wraith_sprite_graph() -> Dict[str, SpriteNode]:
+    """Declare the Wraith sprites and the renders they build on."""
+    graph = {}
     
-    # Movement animation (4 frames)
+    # Movement animation (4 frames), shared with the attack pose as layers
+    graph['move_layers'] = SpriteNode(lambda: wraith_move_layers(range(4)), output=False)
+    graph['move_frames'] = SpriteNode(composite_to_images, ('move_layers',), output=False)
     for i in range(4):
-        sprites[f'move_{i}'] = create_wraith_move(frame=i)
+        graph[f'move_{i}'] = SpriteNode(itemgetter(i), ('move_frames',))
     
     # Attack pose
-    sprites['attack'] = create_wraith_attack()
+    graph['attack'] = SpriteNode(create_wraith_attack, ('move_layers',))
     
     # Death animation
-    sprites['death'] = create_wraith_death()
+    graph['death'] = SpriteNode(create_wraith_death)
     
-    return sprites
+    return graph
 
-def generate_poltergeist_sprites() -> Dict[str, Image.Image]:
-    """Generate Poltergeist monster sprites - chaotic movement."""
-    sprites = {}
+def poltergeist_sprite_graph() -> Dict[str, SpriteNode]:
+    """Declare the Poltergeist sprites and the renders they build on."""
+    graph = {}
     
-    # Energy states
+    # Energy states, shared with the throw pose as layers
+    graph['energy_layers'] = SpriteNode(lambda: poltergeist_energy_layers(range(4)), output=False)
+    graph['energy_frames'] = SpriteNode(composite_to_images, ('energy_layers',), output=False)
     for i in range(4):
-        sprites[f'energy_{i}'] = create_poltergeist_energy(frame=i)
+        graph[f'energy_{i}'] = SpriteNode(itemgetter(i), ('energy_frames',))
     
     # Object throwing pose
-    sprites['throw'] = create_poltergeist_throw()
+    graph['throw'] = SpriteNode(create_poltergeist_throw, ('energy_layers',))
     
     # Death animation
-    sprites['death'] = create_poltergeist_death()
+    graph['death'] = SpriteNode(create_poltergeist_death)
+    
+    return graph
+
+def generate_monster_variants(monsters: Dict[str, Dict[str, Image.Image]]) -> Dict[str, Dict[str, Image.Image]]:
+    """
+    Recolor rendered monsters into every palette in MONSTER_PALETTES.
     
-    return sprites
+    Returns:
+        Dict keyed '<monster>_<variant>' with the same sprite names as the base monster
+    """
+    variants = {}
+    for monster_type, palettes in MONSTER_PALETTES.items():
+        recolored = generate_palette_variants(monsters[monster_type],
+                                              MONSTER_BASE_COLORS[monster_type], palettes)
+        for variant_name, sprites in recolored.items():
+            variants[f'{monster_type}_{variant_name}'] = sprites
+    
+    return variants
+
+def monster_antialias_style(family: str) -> Optional[Dict]:
+    """
+    Post-process style for a monster family or palette variant ('<monster>_<variant>').
+    
+    Dithering styles get the family's palette: the base colors, with the
+    variant's overrides applied for palette variants.
+    """
+    base, _, variant = family.partition('_')
+    style = MONSTER_ANTIALIAS.get(base)
+    if not style or not style.get('dither'):
+        return style
+    colors = MONSTER_BASE_COLORS[base]
+    if variant:
+        colors = palette_variant(colors, MONSTER_PALETTES[base][variant])
+    return {**style, 'palette': colors}
 
 def create_base_monster(size: Tuple[int, int], colors: Dict[str, Tuple]) -> Image.Image:
     """Create a base monster sprite template."""
@@ -126,26 +272,29 @@ def create_base_monster(size: Tuple[int, int], colors: Dict[str, Tuple]) -> Imag
 # Ghost sprite creation functions
 def create_ghost_float(frame: int) -> Image.Image:
     """Create ghost floating animation frame."""
-    img = Image.new('RGBA', (32, 32), GHOST_COLORS['bg'])
-    draw = ImageDraw.Draw(img)
+    return create_ghost_float_frames([frame])[0]
+
+def create_ghost_float_frames(frames: List[int]) -> List[Image.Image]:
+    """Create several ghost floating frames in one compositing pass."""
+    frames = list(frames)
+    ys, xs = frame_grid((32, 32))
     
     # Floating offset based on frame
-    y_offset = [0, -1, 0][frame % 3]
+    y_offset = np.array([[0, -1, 0][frame % 3] for frame in frames])[:, None, None]
     
     # Ghost body (oval shape, semi-transparent)
     center_y = 16 + y_offset
-    for x in range(10, 23):
-        for y in range(8, 24):
-            if ((x - 16) ** 2) / 36 + ((y - center_y) ** 2) / 64 < 1:
-                draw.point((x, y), GHOST_COLORS['body'])
+    body = new_layer(len(frames), (32, 32))
+    in_bounds = (xs >= 10) & (xs < 23) & (ys >= 8) & (ys < 24)
+    oval = ((xs - 16) ** 2) / 36 + ((ys - center_y) ** 2) / 64 < 1
+    paint(body, in_bounds & oval, GHOST_COLORS['body'])
     
-    # Eyes
-    draw.point((13, 12 + y_offset), GHOST_COLORS['eyes'])
-    draw.point((19, 12 + y_offset), GHOST_COLORS['eyes'])
-    draw.point((13, 12 + y_offset), GHOST_COLORS['pupils'])
-    draw.point((19, 12 + y_offset), GHOST_COLORS['pupils'])
+    # Eyes, with pupils layered on top
+    eye_points = ((xs == 13) | (xs == 19)) & (ys == 12 + y_offset)
+    eyes = paint(new_layer(len(frames), (32, 32)), eye_points, GHOST_COLORS['eyes'])
+    pupils = paint(new_layer(len(frames), (32, 32)), eye_points, GHOST_COLORS['pupils'])
     
-    return img
+    return composite_to_images([body, eyes, pupils])
 
 def create_ghost_death() -> Image.Image:
     """Create ghost death animation."""
@@ -163,32 +312,27 @@ def create_ghost_death() -> Image.Image:
 # Shadow sprite creation functions  
 def create_shadow_idle() -> Image.Image:
     """Create shadow idle pose."""
-    img = Image.new('RGBA', (32, 32), SHADOW_COLORS['bg'])
-    draw = ImageDraw.Draw(img)
+    ys, xs = frame_grid((32, 32))
     
     # Dark silhouette humanoid
-    for x in range(12, 21):
-        for y in range(8, 25):
-            if x == 16 or (y > 12 and y < 22):  # Simple silhouette
-                draw.point((x, y), SHADOW_COLORS['body'])
+    in_bounds = (xs >= 12) & (xs < 21) & (ys >= 8) & (ys < 25)
+    silhouette = (xs == 16) | ((ys > 12) & (ys < 22))  # Simple silhouette
+    body = paint(new_layer(1, (32, 32)), in_bounds & silhouette, SHADOW_COLORS['body'])
     
     # Red glowing eyes
-    draw.point((14, 11), SHADOW_COLORS['eyes'])
-    draw.point((18, 11), SHADOW_COLORS['eyes'])
+    eye_mask = ((xs == 14) | (xs == 18)) & (ys == 11)
+    eyes = paint(new_layer(1, (32, 32)), eye_mask, SHADOW_COLORS['eyes'])
     
-    return img
+    return composite_to_images([body, eyes])[0]
 
-def create_shadow_alert() -> Image.Image:
-    """Create shadow alert state."""
-    img = create_shadow_idle()
-    draw = ImageDraw.Draw(img)
-    
-    # Brighter red eyes when alert
-    brighter_eyes = (180, 0, 0, 255)
-    draw.point((14, 11), brighter_eyes)
-    draw.point((18, 11), brighter_eyes)
-    
-    return img
+def create_shadow_alert(idle: Image.Image = None) -> Image.Image:
+    """Create shadow alert state by palette-swapping the idle pose."""
+    if idle is None:
+        idle = create_shadow_idle()
+    
+    variants = generate_palette_variants({'alert': idle}, SHADOW_COLORS,
+                                         {'alert': SHADOW_ALERT_PALETTE})
+    return variants['alert']['alert']
 
 def create_shadow_death() -> Image.Image:
     """Create shadow death animation."""
@@ -206,37 +350,45 @@ def create_shadow_death() -> Image.Image:
 # Wraith sprite creation functions
 def create_wraith_move(frame: int) -> Image.Image:
     """Create wraith movement animation frame."""
-    img = Image.new('RGBA', (32, 32), WRAITH_COLORS['bg'])
-    draw = ImageDraw.Draw(img)
+    return create_wraith_move_frames([frame])[0]
+
+def create_wraith_move_frames(frames: List[int]) -> List[Image.Image]:
+    """Create several wraith movement frames in one compositing pass."""
+    return composite_to_images(wraith_move_layers(frames))
+
+def wraith_move_layers(frames: List[int]) -> List[Layer]:
+    """Build wraith movement frames as compositing layers."""
+    frames = list(frames)
+    ys, xs = frame_grid((32, 32))
     
     # Flowing movement based on frame
-    flow_offset = [-1, 0, 1, 0][frame % 4]
+    flow_offset = np.array([[-1, 0, 1, 0][frame % 4] for frame in frames])[:, None, None]
     
-    # Ethereal flowing form
-    for x in range(8, 25):
-        for y in range(6, 26):
-            if (x + flow_offset) % 3 == 0 and y % 2 == 0:
-                draw.point((x, y), WRAITH_COLORS['body'])
-            elif (x + flow_offset) % 4 == 0:
-                draw.point((x, y), WRAITH_COLORS['wisp'])
+    # Ethereal flowing form: dense body strands with lighter wisps between
+    in_bounds = (xs >= 8) & (xs < 25) & (ys >= 6) & (ys < 26)
+    body_mask = in_bounds & ((xs + flow_offset) % 3 == 0) & (ys % 2 == 0)
+    wisp_mask = in_bounds & ((xs + flow_offset) % 4 == 0) & ~body_mask
+    body = paint(new_layer(len(frames), (32, 32)), body_mask, WRAITH_COLORS['body'])
+    wisps = paint(new_layer(len(frames), (32, 32)), wisp_mask, WRAITH_COLORS['wisp'])
     
-    # Bright yellow eyes
-    draw.point((13, 10), WRAITH_COLORS['eyes'])
-    draw.point((19, 10), WRAITH_COLORS['eyes'])
+    # Bright yellow eyes glow over the body
+    eye_mask = ((xs == 13) | (xs == 19)) & (ys == 10)
+    eyes = paint(new_layer(len(frames), (32, 32), mode='add'), eye_mask, WRAITH_COLORS['eyes'])
     
-    return img
+    return [body, wisps, eyes]
 
-def create_wraith_attack() -> Image.Image:
-    """Create wraith attack pose."""
-    img = create_wraith_move(0)
-    draw = ImageDraw.Draw(img)
+def create_wraith_attack(move_layers: List[Layer] = None) -> Image.Image:
+    """Create wraith attack pose over the first movement frame's layers."""
+    if move_layers is None:
+        move_layers = wraith_move_layers([0])
+    
+    ys, xs = frame_grid((32, 32))
     
     # Extended wispy arms for attack
-    for x in range(6, 26):
-        if x < 12 or x > 20:
-            draw.point((x, 14), WRAITH_COLORS['wisp'])
+    arm_mask = (xs >= 6) & (xs < 26) & ((xs < 12) | (xs > 20)) & (ys == 14)
+    arms = paint(new_layer(1, (32, 32)), arm_mask, WRAITH_COLORS['wisp'])
     
-    return img
+    return composite_to_images(frame_layers(move_layers, 0) + [arms])[0]
 
 def create_wraith_death() -> Image.Image:
     """Create wraith death animation."""
@@ -253,42 +405,54 @@ def create_wraith_death() -> Image.Image:
 # Poltergeist sprite creation functions
 def create_poltergeist_energy(frame: int) -> Image.Image:
     """Create poltergeist energy state frame."""
-    img = Image.new('RGBA', (32, 32), POLTERGEIST_COLORS['bg'])
-    draw = ImageDraw.Draw(img)
+    return create_poltergeist_energy_frames([frame])[0]
+
+def create_poltergeist_energy_frames(frames: List[int]) -> List[Image.Image]:
+    """Create several poltergeist energy frames in one compositing pass."""
+    return composite_to_images(poltergeist_energy_layers(frames))
+
+def poltergeist_energy_layers(frames: List[int]) -> List[Layer]:
+    """Build poltergeist energy frames as compositing layers."""
+    frames = list(frames)
+    ys, xs = frame_grid((32, 32))
     
     # Chaotic energy pattern based on frame
-    energy_pattern = [(0, 0), (1, -1), (-1, 0), (0, 1)][frame % 4]
+    energy_pattern = np.array([[(0, 0), (1, -1), (-1, 0), (0, 1)][frame % 4] for frame in frames])
+    center_x = 16 + energy_pattern[:, 0, None, None]
+    center_y = 16 + energy_pattern[:, 1, None, None]
+    dx, dy = xs - center_x, ys - center_y
     
     # Green energy aura
-    center_x, center_y = 16 + energy_pattern[0], 16 + energy_pattern[1]
-    for x in range(center_x - 6, center_x + 7):
-        for y in range(center_y - 6, center_y + 7):
-            if (x - center_x) ** 2 + (y - center_y) ** 2 < 25:
-                draw.point((x, y), POLTERGEIST_COLORS['aura'])
+    aura_mask = (dx >= -6) & (dx <= 6) & (dy >= -6) & (dy <= 6) & (dx ** 2 + dy ** 2 < 25)
+    aura = paint(new_layer(len(frames), (32, 32)), aura_mask, POLTERGEIST_COLORS['aura'])
     
-    # Brighter core
-    for x in range(center_x - 2, center_x + 3):
-        for y in range(center_y - 2, center_y + 3):
-            draw.point((x, y), POLTERGEIST_COLORS['core'])
+    # Brighter core glowing through the aura
+    core_mask = (np.abs(dx) <= 2) & (np.abs(dy) <= 2)
+    core = paint(new_layer(len(frames), (32, 32), mode='add'), core_mask, POLTERGEIST_COLORS['core'])
     
     # Floating objects effect
-    draw.point((center_x - 8, center_y - 4), POLTERGEIST_COLORS['effects'])
-    draw.point((center_x + 8, center_y + 3), POLTERGEIST_COLORS['effects'])
+    effects_mask = ((dx == -8) & (dy == -4)) | ((dx == 8) & (dy == 3))
+    effects = paint(new_layer(len(frames), (32, 32), mode='add'), effects_mask,
+                    POLTERGEIST_COLORS['effects'])
     
-    return img
+    return [aura, core, effects]
 
-def create_poltergeist_throw() -> Image.Image:
-    """Create poltergeist throwing objects pose."""
-    img = create_poltergeist_energy(0)
-    draw = ImageDraw.Draw(img)
+def create_poltergeist_throw(energy_layers: List[Layer] = None) -> Image.Image:
+    """Create poltergeist throwing objects pose over the first energy frame's layers."""
+    if energy_layers is None:
+        energy_layers = poltergeist_energy_layers([0])
+    
+    ys, xs = frame_grid((32, 32))
     
     # Additional flying objects
+    objects_mask = np.zeros((1, 32, 32), dtype=bool)
     for i in range(5):
         x = 8 + i * 4
         y = 8 + (i * 2) % 16
-        draw.point((x, y), POLTERGEIST_COLORS['effects'])
+        objects_mask |= (xs == x) & (ys == y)
+    objects = paint(new_layer(1, (32, 32), mode='add'), objects_mask, POLTERGEIST_COLORS['effects'])
     
-    return img
+    return composite_to_images(frame_layers(energy_layers, 0) + [objects])[0]
 
 def create_poltergeist_death() -> Image.Image:
     """Create poltergeist death animation."""
@@ -0,0 +1,160 @@
+"""
+Palette Swapping for Gas Huffer Sprites
+
+Converts a family of rendered sprites into palette indices once, then
+produces recolored variants with a lookup-table gather (`lut[indices]`),
+so each variant costs about one memory copy instead of a full re-render.
+
+Variant palettes are named override sets layered on top of the existing
+color dicts (GHOST_COLORS, FLOOR_COLORS, ...).
+"""
+
+from PIL import Image
+import numpy as np
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+# Colors that are not an exact palette entry (blends, outline shades) follow
+# the nearest palette entry if it is within this RGBA distance
+MATCH_TOLERANCE = 48.0
+
+class IndexedSprites(NamedTuple):
+    """A family of same-sized sprites stored as palette indices."""
+    names: List[str]
+    indices: np.ndarray  # (sprites, height, width) indices into `palette`
+    palette: np.ndarray  # (colors, 4) uint8 RGBA entries
+
+def _rgba(color: Tuple[int, ...]) -> Tuple[int, ...]:
+    return tuple(color) + (255,) * (4 - len(color))
+
+def palette_variant(base: Dict[str, Tuple], overrides: Dict[str, Tuple]) -> Dict[str, Tuple]:
+    """Build a named palette from a base color dict and a set of overrides."""
+    unknown = set(overrides) - set(base)
+    if unknown:
+        raise KeyError(f"Palette overrides reference unknown colors: {sorted(unknown)}")
+    return {**base, **overrides}
+
+def index_sprites(sprites: Dict[str, Image.Image]) -> IndexedSprites:
+    """Render a family of sprites down to shared palette indices."""
+    names = [name for name, sprite in sprites.items() if sprite is not None]
+    pixels = np.stack([np.asarray(sprites[name].convert('RGBA')) for name in names])
+
+    # Pack RGBA into one integer per pixel so np.unique can build the palette
+    packed = pixels.view(np.uint32)[..., 0]
+    colors, inverse = np.unique(packed, return_inverse=True)
+    dtype = np.uint8 if len(colors) <= 256 else np.uint16
+
+    indices = inverse.reshape(packed.shape).astype(dtype)
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    return IndexedSprites(names, indices, palette)
+
+def build_lut(palette: np.ndarray, base_colors: Dict[str, Tuple],
+              variant_colors: Dict[str, Tuple], tolerance: float = MATCH_TOLERANCE) -> np.ndarray:
+    """
+    Build the lookup table mapping each palette entry to its variant color.
+
+    Every entry is matched to its nearest base color. Within `tolerance` the
+    entry is shifted by that color's change (exact matches land exactly on the
+    variant color); entries further away, and transparent pixels, are kept.
+
+    Returns:
+        uint8 array with the same shape as `palette`
+    """
+    keys = [key for key in base_colors if key != 'bg']
+    base = np.array([_rgba(base_colors[key]) for key in keys], dtype=np.float32)
+    variant = np.array([_rgba(variant_colors[key]) for key in keys], dtype=np.float32)
+
+    entries = palette.astype(np.float32)
+    distances = np.linalg.norm(entries[:, None, :] - base[None, :, :], axis=-1)
+    nearest = distances.argmin(axis=1)
+    close = (distances[np.arange(len(entries)), nearest] <= tolerance) & (palette[:, 3] > 0)
+
+    shifted = np.clip(entries + (variant - base)[nearest], 0, 255)
+    return np.where(close[:, None], np.rint(shifted), entries).astype(np.uint8)
+
+def recolor(indexed: IndexedSprites, luts: np.ndarray) -> np.ndarray:
+    """
+    Apply one or more lookup tables to indexed sprites in a single gather.
+
+    Args:
+        luts: (colors, 4) for one variant or (variants, colors, 4) for many
+
+    Returns:
+        uint8 RGBA array of shape (sprites, h, w, 4) or (variants, sprites, h, w, 4)
+    """
+    # Gather whole RGBA pixels as uint32 words rather than four separate bytes
+    packed = np.ascontiguousarray(luts).view(np.uint32)[..., 0]
+    if luts.ndim == 2:
+        gathered = packed[indexed.indices]
+    else:
+        gathered = packed[:, indexed.indices]
+    return gathered[..., np.newaxis].view(np.uint8)
+
+def to_sprites(indexed: IndexedSprites, pixels: np.ndarray) -> Dict[str, Image.Image]:
+    """Turn recolored pixels for one variant back into a dict of PIL sprites."""
+    return {name: Image.fromarray(frame, 'RGBA') for name, frame in zip(indexed.names, pixels)}
+
+def generate_palette_variants(sprites: Dict[str, Image.Image], base_colors: Dict[str, Tuple],
+                              variants: Dict[str, Dict[str, Tuple]],
+                              changed_only: bool = False) -> Dict[str, Dict[str, Image.Image]]:
+    """
+    Recolor a sprite family into every named palette variant.
+
+    Args:
+        sprites: Family of same-sized sprites rendered with `base_colors`
+        base_colors: The palette dict the family was rendered with
+        variants: Variant name -> color overrides on top of `base_colors`
+        changed_only: Leave out sprites the variant palette does not alter
+
+    Returns:
+        Dict of variant name -> recolored sprite dict
+    """
+    if not variants:
+        return {}
+
+    indexed = index_sprites(sprites)
+    luts = np.stack([
+        build_lut(indexed.palette, base_colors, palette_variant(base_colors, overrides))
+        for overrides in variants.values()
+    ])
+    recolored = recolor(indexed, luts)
+
+    result = {}
+    for variant_name, lut, pixels in zip(variants, luts, recolored):
+        family = to_sprites(indexed, pixels)
+        if changed_only:
+            # A sprite changes only if it uses a palette entry the lut alters
+            altered = np.flatnonzero((lut != indexed.palette).any(axis=1))
+            uses_altered = np.isin(indexed.indices, altered).any(axis=(1, 2))
+            family = {name: family[name] for name, used in zip(indexed.names, uses_altered) if used}
+        result[variant_name] = family
+
+    return result
+
+if __name__ == "__main__":
+    from monster_sprites import generate_monster_sprites, MONSTER_BASE_COLORS
+
+    monsters = generate_monster_sprites()
+    variant_count = 50
+
+    start = time.perf_counter()
+    indexed = {monster: index_sprites(sprites) for monster, sprites in monsters.items()}
+    index_time = time.perf_counter() - start
+
+    recolor_time = copy_time = 0.0
+    for monster, family in indexed.items():
+        # Random luts stand in for 50 named palettes; the cost is the gather
+        luts = np.random.randint(0, 256, (variant_count,) + family.palette.shape, dtype=np.uint8)
+        start = time.perf_counter()
+        recolor(family, luts)
+        recolor_time += time.perf_counter() - start
+
+        frames = np.stack([np.asarray(monsters[monster][name]) for name in family.names])
+        start = time.perf_counter()
+        for _ in range(variant_count):
+            frames.copy()
+        copy_time += time.perf_counter() - start
+
+    print(f"Indexed {len(MONSTER_BASE_COLORS)} monster families in {index_time * 1000:.2f} ms")
+    print(f"   {variant_count} recolors per family: {recolor_time * 1000:.2f} ms")
+    print(f"   {variant_count} plain copies per family: {copy_time * 1000:.2f} ms")
@@ -0,0 +1,225 @@
+"""
+Dependency-Aware Sprite Scheduling
+
+Sprite definitions declare which other sprites (or intermediate renders,
+like the bare Gas Huffer body) they build on. The scheduler turns those
+declarations into a DAG, computes every node exactly once, runs
+independent branches on a thread pool and records how long each node took
+so the critical path of a run can be reported.
+
+Results are shared with dependents copy-on-write: NumPy arrays (including
+compositing layers) are handed out read-only, so a dependent that wants to
+change one must copy it first. PIL images are mutable, so each dependent
+receives its own `copy()` of them, made when the dependent reads them: a
+node that picks one frame out of a list of frames copies only that frame.
+"""
+
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+import numpy as np
+
+class SpriteNode(NamedTuple):
+    """A sprite definition: a render function and the nodes it consumes."""
+    render: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    output: bool = True  # False for intermediate renders that are not sprites
+
+class GraphRun(NamedTuple):
+    """Results of a scheduler run."""
+    results: Dict[str, Any]
+    durations: Dict[str, float]
+    critical_path: List[str]
+    critical_time: float
+    wall_time: float
+
+    def outputs(self, graph: Dict[str, SpriteNode]) -> Dict[str, Any]:
+        """The results of output nodes, in graph declaration order."""
+        return {name: self.results[name] for name, node in graph.items() if node.output}
+
+def topological_order(graph: Dict[str, SpriteNode]) -> List[str]:
+    """
+    Order nodes so every node comes after its dependencies.
+
+    Raises:
+        ValueError: On unknown dependencies or cycles
+    """
+    for name, node in graph.items():
+        missing = [dep for dep in node.deps if dep not in graph]
+        if missing:
+            raise ValueError(f"Sprite node '{name}' depends on unknown nodes: {missing}")
+
+    order = []
+    state = {}  # name -> 'visiting' | 'done'
+
+    def visit(name, chain):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Sprite dependency cycle: {' -> '.join(chain + [name])}")
+        state[name] = 'visiting'
+        for dep in graph[name].deps:
+            visit(dep, chain + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in graph:
+        visit(name, [])
+    return order
+
+def freeze(value: Any) -> Any:
+    """Make a result safe to share: read-only NumPy views, containers frozen recursively."""
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return type(value)(*(freeze(item) for item in value))
+    if isinstance(value, (list, tuple)):
+        return type(value)(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return {key: freeze(item) for key, item in value.items()}
+    return value
+
+class HandOffSequence(Sequence):
+    """Read-only view of a frozen list or tuple that hands off each item as it is read."""
+
+    def __init__(self, items):
+        self._items = items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [hand_off(item) for item in self._items[index]]
+        return hand_off(self._items[index])
+
+class HandOffMapping(Mapping):
+    """Read-only view of a frozen dict that hands off each value as it is read."""
+
+    def __init__(self, items):
+        self._items = items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, key):
+        return hand_off(self._items[key])
+
+def hand_off(value: Any) -> Any:
+    """
+    Prepare a frozen result for one dependent; PIL images get a private copy.
+
+    Lists, tuples and dicts are wrapped instead of copied, so only the items
+    a dependent actually reads are copied (again on every read).
+    """
+    if isinstance(value, Image.Image):
+        return value.copy()
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return type(value)(*(hand_off(item) for item in value))
+    if isinstance(value, (list, tuple)):
+        return HandOffSequence(value)
+    if isinstance(value, dict):
+        return HandOffMapping(value)
+    return value
+
+def critical_path(graph: Dict[str, SpriteNode], durations: Dict[str, float]) -> Tuple[List[str], float]:
+    """Longest chain of dependent nodes by total render time."""
+    finish = {}
+    previous = {}
+    for name in topological_order(graph):
+        deps = graph[name].deps
+        slowest = max(deps, key=lambda dep: finish[dep], default=None)
+        finish[name] = durations[name] + (finish[slowest] if slowest else 0.0)
+        previous[name] = slowest
+
+    if not finish:
+        return [], 0.0
+    name = max(finish, key=finish.get)
+    total = finish[name]
+    path = []
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+    return path[::-1], total
+
+def run_graph(graph: Dict[str, SpriteNode], workers: Optional[int] = None) -> GraphRun:
+    """
+    Compute every node of a sprite graph exactly once.
+
+    Args:
+        graph: Node name -> SpriteNode
+        workers: Thread pool size; 1 renders serially in dependency order
+
+    Returns:
+        GraphRun with all results, per-node durations and the critical path
+    """
+    order = topological_order(graph)
+    results = {}
+    durations = {}
+    start = time.perf_counter()
+
+    def execute(name):
+        node = graph[name]
+        args = [hand_off(results[dep]) for dep in node.deps]
+        node_start = time.perf_counter()
+        value = node.render(*args)
+        return name, freeze(value), time.perf_counter() - node_start
+
+    if workers == 1:
+        for name in order:
+            _, results[name], durations[name] = execute(name)
+    else:
+        pending = {name: set(graph[name].deps) for name in order}
+        dependents = {name: [] for name in order}
+        for name in order:
+            for dep in graph[name].deps:
+                dependents[dep].append(name)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sprite-node') as pool:
+            running = {pool.submit(execute, name) for name in order if not pending[name]}
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, value, duration = future.result()
+                    results[name] = value
+                    durations[name] = duration
+                    for dependent in dependents[name]:
+                        pending[dependent].discard(name)
+                        if not pending[dependent]:
+                            running.add(pool.submit(execute, dependent))
+
+    path, path_time = critical_path(graph, durations)
+    return GraphRun(results, durations, path, path_time, time.perf_counter() - start)
+
+def render_graph(graph: Dict[str, SpriteNode], workers: Optional[int] = None) -> Dict[str, Any]:
+    """Run a sprite graph and return its output sprites in declaration order."""
+    return run_graph(graph, workers).outputs(graph)
+
+def combine_graphs(graphs: Dict[str, Dict[str, SpriteNode]]) -> Dict[str, SpriteNode]:
+    """
+    Merge named graphs into one so their branches can be scheduled together.
+
+    Node names (and dependencies) are prefixed with '<graph name>/'.
+    """
+    combined = {}
+    for prefix, graph in graphs.items():
+        for name, node in graph.items():
+            deps = tuple(f'{prefix}/{dep}' for dep in node.deps)
+            combined[f'{prefix}/{name}'] = node._replace(deps=deps)
+    return combined
+
+def split_outputs(outputs: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Undo one level of combine_graphs() prefixes on a dict of outputs."""
+    split = {}
+    for name, value in outputs.items():
+        prefix, _, rest = name.partition('/')
+        split.setdefault(prefix, {})[rest] = value
+    return split